@@ -4,11 +4,12 @@
 B站API模块 - 导出主要接口
 """
 
-from .danmaku import DanmakuMonitorThread
+from .danmaku import DanmakuMonitorThread, set_debug
 from .login import QRLoginThread, LoginManager
 
 __all__ = [
     'DanmakuMonitorThread',
     'QRLoginThread', 
-    'LoginManager'
+    'LoginManager',
+    'set_debug'
 ]
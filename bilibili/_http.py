@@ -0,0 +1,13 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTTP辅助模块 - 预构建的请求头
+"""
+
+from multidict import CIMultiDict, CIMultiDictProxy
+
+from config import Constants
+
+
+# 预先规范化的默认请求头，作为共享会话的默认头使用
+AIOHTTP_HEADERS = CIMultiDictProxy(CIMultiDict(Constants.DEFAULT_HEADERS))
@@ -5,8 +5,10 @@ B站API相关模块 - 处理弹幕监控和登录
 """
 
 import asyncio
+import concurrent.futures
+import logging
+import random
 import time
-import traceback
 from typing import Optional, Dict, Any, Callable
 
 from PyQt6.QtCore import QThread, pyqtSignal
@@ -15,18 +17,99 @@ import bilibili_api
 from bilibili_api import live, Credential
 
 from models import MessageInfo
-from utils import filter_cookie_data, get_current_timestamp
+from utils import filter_cookie_data, get_current_timestamp, TokenBucket
 from config import Constants
 from utils import bilibili_logger
+from .runtime import AsyncRuntime
+
+
+# Credential参数名 -> cookie字段名
+_CREDENTIAL_FIELDS = (
+    ('sessdata', 'SESSDATA'),
+    ('bili_jct', 'bili_jct'),
+    ('buvid3', 'buvid3'),
+    ('dedeuserid', 'DedeUserID'),
+    ('ac_time_value', 'ac_time_value'),
+)
+
+# 舰长等级名称
+GUARD_NAMES = Constants.GUARD_LEVEL_NAMES
+
+
+def _log_danmu(payload: Dict[str, Any]):
+    """记录弹幕消息（DEBUG级别，避免日志过多）"""
+    if bilibili_logger.isEnabledFor(logging.DEBUG):
+        bilibili_logger.debug("处理弹幕消息", f"{payload['username']}: {payload.get('message', '')}")
+
+
+def _log_guard(payload: Dict[str, Any]):
+    """记录舰长消息（INFO级别，这是重要事件）"""
+    guard_level = payload.get('guard_level', 0)
+    guard_name = GUARD_NAMES.get(guard_level) or f"等级{guard_level}"
+    bilibili_logger.info("处理舰长消息", f"{payload['username']} 购买{guard_name}")
+
+
+def _log_gift(payload: Dict[str, Any]):
+    """记录礼物消息（DEBUG级别）"""
+    if bilibili_logger.isEnabledFor(logging.DEBUG):
+        gift_name = payload.get('gift_name', '未知礼物')
+        num = payload.get('num', 1)
+        bilibili_logger.debug("处理礼物消息", f"{payload['username']} 送出 {gift_name} x{num}")
+
+
+def _log_super_chat(payload: Dict[str, Any]):
+    """记录醒目留言（INFO级别）"""
+    price = payload.get('price', 0)
+    bilibili_logger.info("处理醒目留言", f"{payload['username']} (¥{price})")
+
+
+def _log_default(payload: Dict[str, Any]):
+    """未知消息类型不记录"""
+
+
+def set_debug(enabled: bool):
+    """
+    设置bilibili-api弹幕客户端的调试模式（下次连接时生效）
+    
+    调试模式会记录每一个原始数据帧，开销很大，只应在开发调试时启用。
+    
+    Args:
+        enabled (bool): 是否启用调试模式
+    """
+    Constants.DEBUG_MODE = bool(enabled)
+
+
+# 消息类型 -> 日志记录函数
+_DISPATCH = {
+    Constants.MESSAGE_TYPE_DANMAKU: _log_danmu,
+    Constants.MESSAGE_TYPE_GUARD: _log_guard,
+    Constants.MESSAGE_TYPE_GIFT: _log_gift,
+    Constants.MESSAGE_TYPE_SUPER_CHAT: _log_super_chat,
+}
 
 
 class DanmakuMonitorThread(QThread):
     """弹幕监控线程 - 使用bilibili-api库"""
     
     # 信号定义
-    message_received = pyqtSignal(dict)  # 消息接收信号
+    message_received = pyqtSignal(dict)  # 消息接收信号（批次中只有一条消息时）
+    messages_batched = pyqtSignal(list)  # 批量消息信号
     status_changed = pyqtSignal(str)     # 状态变化信号
     error_occurred = pyqtSignal(str)     # 错误发生信号
+    stopped = pyqtSignal()               # 监控已停止信号
+    
+    # 事件名称 -> 处理方法名称
+    _HANDLERS = (
+        ('VERIFICATION_SUCCESSFUL', '_handle_verification'),
+        ('INTERACT_WORD', '_handle_interact_word'),
+        ('DANMU_MSG', '_handle_danmu'),
+        ('SEND_GIFT', '_handle_gift'),
+        ('LIVE', '_handle_live_status'),
+        ('HEARTBEAT', '_handle_heartbeat'),
+        ('GUARD_BUY', '_handle_guard'),
+        ('SUPER_CHAT_MESSAGE', '_handle_super_chat'),
+        ('DISCONNECT', '_handle_disconnect'),
+    )
     
     def __init__(self, room_id: int, cookies: Optional[Dict[str, Any]] = None):
         """
@@ -40,46 +123,86 @@ class DanmakuMonitorThread(QThread):
         self.room_id = room_id
         self.cookies = cookies or {}
         self.live_danmaku = None
+        self._handlers_registered_on = None
         self.loop = None
+        self._future: Optional[concurrent.futures.Future] = None
+        self._out_queue: Optional[asyncio.Queue] = None
         self.running = False
         self._reconnect_count = 0
-        self._max_reconnect_attempts = Constants.HTTP_TIMEOUT
+        self._max_reconnect_attempts = Constants.DANMAKU_MAX_RECONNECT_ATTEMPTS
+        # 限制异常堆栈的输出频率，避免异常数据帧刷屏
+        self._tb_limiter = TokenBucket(rate=2, burst=5)
+        # 凭据只依赖cookies，构建一次供每次重连复用
+        self._credential = self._build_credential(self.cookies)
     
     def run(self):
-        """在新线程中运行异步事件循环"""
+        """将主协程提交到共享事件循环，并等待其结束"""
         try:
             bilibili_logger.operation_start("启动弹幕监控", f"房间ID: {self.room_id}")
             self.running = True  # 设置运行状态
             
-            # 创建新的事件循环
-            self.loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(self.loop)
+            # 使用进程级共享的事件循环
+            runtime = AsyncRuntime.instance()
+            self.loop = runtime.loop
             
             # 运行主协程
-            self.loop.run_until_complete(self._main())
+            self._future = runtime.submit(self._main())
+            self._future.result()
             
+        except concurrent.futures.CancelledError:
+            bilibili_logger.info("弹幕监控任务已取消")
         except Exception as e:
             error_msg = f"弹幕监控线程异常: {str(e)}"
-            bilibili_logger.error("弹幕监控错误", error_msg)
-            bilibili_logger.error("详细错误堆栈", traceback.format_exc())
+            bilibili_logger.exception("弹幕监控错误", error_msg)
             self.error_occurred.emit(error_msg)
-        finally:
-            self._cleanup_loop()
     
     async def _main(self):
         """主协程"""
+        self._out_queue = asyncio.Queue()
+        flush_task = asyncio.create_task(self._flush_loop())
+        try:
+            await self._reconnect_loop()
+        finally:
+            flush_task.cancel()
+    
+    async def _flush_loop(self):
+        """将待发送的消息按批次合并后发送到主线程"""
+        queue = self._out_queue
+        while True:
+            batch = [await queue.get()]
+            deadline = time.monotonic() + Constants.MESSAGE_BATCH_INTERVAL
+            while len(batch) < Constants.MESSAGE_BATCH_SIZE:
+                if not queue.empty():
+                    batch.append(queue.get_nowait())
+                    continue
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            if len(batch) == 1:
+                self.message_received.emit(batch[0])
+            else:
+                self.messages_batched.emit(batch)
+    
+    async def _reconnect_loop(self):
+        """连接与重连循环"""
         while self.running:
             try:
                 await self._connect_and_monitor()
                 
-                # 如果connect正常返回，说明连接被断开了
+                # connect正常返回说明bilibili-api内部重试已用尽
                 if self.running:  # 如果还在运行状态，说明不是用户主动停止
                     bilibili_logger.warning("连接意外断开，准备重连")
                     self._reconnect_count += 1
                     
                     if self._reconnect_count < self._max_reconnect_attempts:
-                        self.status_changed.emit(f"连接断开，{Constants.LOGIN_POLL_INTERVAL}秒后重连 (尝试 {self._reconnect_count}/{self._max_reconnect_attempts})...")
-                        await asyncio.sleep(Constants.LOGIN_POLL_INTERVAL)
+                        delay = self._reconnect_delay()
+                        self.status_changed.emit(f"连接断开，{delay:.0f}秒后重连 (尝试 {self._reconnect_count}/{self._max_reconnect_attempts})...")
+                        await asyncio.sleep(delay)
                     else:
                         self.error_occurred.emit("超过最大重连次数，停止重连")
                         break
@@ -94,87 +217,61 @@ class DanmakuMonitorThread(QThread):
                 bilibili_logger.error("弹幕监控错误", error_msg)
                 
                 if self._reconnect_count < self._max_reconnect_attempts:
-                    self.status_changed.emit(f"连接异常，{Constants.LOGIN_POLL_INTERVAL}秒后重试...")
-                    await asyncio.sleep(Constants.LOGIN_POLL_INTERVAL)
+                    delay = self._reconnect_delay()
+                    self.status_changed.emit(f"连接异常，{delay:.0f}秒后重试...")
+                    await asyncio.sleep(delay)
                 else:
                     self.error_occurred.emit("超过最大重连次数，连接失败")
                     break
     
+    def _reconnect_delay(self) -> float:
+        """
+        计算下一次重连前的等待时间（指数退避 + 随机抖动）
+        
+        Returns:
+            float: 等待秒数
+        """
+        base = min(Constants.DANMAKU_RECONNECT_MAX_DELAY, 2 ** self._reconnect_count)
+        return base + random.uniform(0, 1.0)
+    
     async def _connect_and_monitor(self):
         """连接并监控弹幕"""
         self.status_changed.emit(f"正在连接到直播间 {self.room_id}...")
         bilibili_logger.operation_start("连接直播间", str(self.room_id))
         try:
-            # 创建Credential对象（如果有cookies的话）
-            credential = None
-            if self.cookies:
-                # 过滤掉用户信息，只保留cookie数据
-                cookie_data = {k: v for k, v in self.cookies.items() if k != 'user_info' and isinstance(v, str)}
-                if cookie_data:
-                    bilibili_logger.debug("设置凭据", str(list(cookie_data.keys())))
-                    credential = Credential(
-                        sessdata=cookie_data.get('SESSDATA', ''),
-                        bili_jct=cookie_data.get('bili_jct', ''),
-                        buvid3=cookie_data.get('buvid3', ''),
-                        dedeuserid=cookie_data.get('DedeUserID', ''),
-                        ac_time_value=cookie_data.get('ac_time_value', '')
-                    )
-            
-            bilibili_logger.debug("凭据创建完成", str(credential is not None))
-            
-            # 简单测试：先获取直播间信息
-            bilibili_logger.operation_start("测试获取直播间信息")
-            room = live.LiveRoom(room_display_id=self.room_id, credential=credential)
-            room_info = await room.get_room_info()
-            bilibili_logger.operation_complete("获取直播间信息", room_info.get("title", "Unknown"))
-            
-            # 创建LiveDanmaku对象
-            self.live_danmaku = live.LiveDanmaku(
-                room_display_id=self.room_id,
-                debug=True,  # 开启调试模式以获取更多信息
-                credential=credential
-            )
-            bilibili_logger.debug("LiveDanmaku对象创建完成")
+            # 只在首次连接时创建LiveDanmaku对象，之后的重启复用同一实例；
+            # 传输层的短暂断开由bilibili-api内部按max_retry/retry_after重试
+            if self.live_danmaku is None:
+                credential = self._credential
+                
+                # 简单测试：先获取直播间信息
+                bilibili_logger.operation_start("测试获取直播间信息")
+                room = live.LiveRoom(room_display_id=self.room_id, credential=credential)
+                room_info = await room.get_room_info()
+                bilibili_logger.operation_complete("获取直播间信息", room_info.get("title", "Unknown"))
+                if not self.running:
+                    return
+                
+                # 创建LiveDanmaku对象
+                self.live_danmaku = live.LiveDanmaku(
+                    room_display_id=self.room_id,
+                    debug=Constants.DEBUG_MODE,  # 调试模式会逐帧输出日志，仅用于开发排查
+                    credential=credential,
+                    max_retry=Constants.DANMAKU_TRANSPORT_MAX_RETRY,
+                    retry_after=Constants.DANMAKU_TRANSPORT_RETRY_AFTER
+                )
+                bilibili_logger.debug("LiveDanmaku对象创建完成")
+                
+                # 注册事件处理器
+                self._register_event_handlers()
             
-            # 注册事件处理器
-            self._register_event_handlers()
-            bilibili_logger.debug("事件处理器注册完成")
-              # 连接到弹幕服务器
+            # 连接到弹幕服务器
             bilibili_logger.operation_start("连接弹幕服务器")
             self.status_changed.emit("正在连接弹幕服务器...")
             
-            # 使用事件处理来确认连接状态
-            connection_confirmed = False
-              # 添加连接确认事件处理
-            @self.live_danmaku.on('VERIFICATION_SUCCESSFUL')
-            async def on_verification_success(event):
-                nonlocal connection_confirmed
-                connection_confirmed = True
-                bilibili_logger.operation_complete("弹幕服务器认证", "成功")
-                
-                # 检查是否以登录用户身份连接
-                if credential and credential.sessdata:
-                    bilibili_logger.info("已以登录用户身份连接到弹幕服务器")
-                    self.status_changed.emit(f"✅ 已以登录用户身份连接到直播间 {self.room_id}")
-                else:
-                    bilibili_logger.info("已以访客身份连接到弹幕服务器")
-                    self.status_changed.emit(f"✅ 已以访客身份连接到直播间 {self.room_id}")
-            
-            # 添加用户进入直播间事件处理
-            @self.live_danmaku.on('INTERACT_WORD')
-            async def on_interact_word(event):
-                """用户进入直播间事件"""
-                try:
-                    data = event['data']['data']
-                    username = data.get('uname', '未知用户')
-                    msg_type = data.get('msg_type', 1)
-                    
-                    if msg_type == 1:  # 进入直播间
-                        bilibili_logger.debug("用户进入直播间", username)
-                except Exception as e:
-                    bilibili_logger.error("处理用户进入事件异常", str(e))
-            
             # 直接连接，不设置超时（让bilibili-api自己处理）
+            if not self.running:
+                return
             await self.live_danmaku.connect()
             
             # 如果连接方法返回，说明连接断开了
@@ -187,224 +284,265 @@ class DanmakuMonitorThread(QThread):
             raise
         except Exception as e:
             error_msg = f"连接失败: {str(e)}"
-            bilibili_logger.error("弹幕监控错误", error_msg)
-            print(f"错误详情: {type(e).__name__}")
-            import traceback
-            traceback.print_exc()
+            if self._tb_limiter.allow():
+                bilibili_logger.exception("弹幕监控错误", error_msg)
+            else:
+                bilibili_logger.error("弹幕监控错误", error_msg)
             self.error_occurred.emit(error_msg)
             raise
     
-    def _create_credential(self) -> Optional[Credential]:
-        """创建认证凭据"""
-        credential = None
-        if self.cookies:
-            # 按照成功脚本的逻辑过滤cookie数据
-            cookie_data = {k: v for k, v in self.cookies.items() 
-                          if k != 'user_info' and isinstance(v, str)}
+    @staticmethod
+    def _build_credential(cookies: Dict[str, Any]) -> Optional[Credential]:
+        """
+        根据cookies创建认证凭据
+        
+        Args:
+            cookies (Dict): 登录cookies
             
-            if cookie_data:
-                bilibili_logger.info("使用已登录用户凭据连接弹幕服务器")
-                bilibili_logger.debug("可用cookie字段", str(list(cookie_data.keys())))
-                
-                # 创建Credential对象，使用与成功脚本相同的参数
-                credential = Credential(
-                    sessdata=cookie_data.get('SESSDATA', ''),
-                    bili_jct=cookie_data.get('bili_jct', ''),
-                    buvid3=cookie_data.get('buvid3', ''),
-                    dedeuserid=cookie_data.get('DedeUserID', ''),
-                    ac_time_value=cookie_data.get('ac_time_value', '')
-                )
-                
-                # 验证凭据有效性
-                bilibili_logger.debug("凭据创建结果:")
-                bilibili_logger.debug("SESSDATA", "✅ 已设置" if credential.sessdata else "❌ 未设置")
-                bilibili_logger.debug("bili_jct", "✅ 已设置" if credential.bili_jct else "❌ 未设置")
-                bilibili_logger.debug("buvid3", "✅ 已设置" if credential.buvid3 else "❌ 未设置")
-                bilibili_logger.debug("DedeUserID", "✅ 已设置" if credential.dedeuserid else "❌ 未设置")
-                
-                # 如果缺少关键字段，警告但仍然尝试连接
-                if not credential.sessdata or not credential.bili_jct:
-                    bilibili_logger.warning("缺少关键cookie字段，可能无法以登录用户身份连接")
-                else:
-                    bilibili_logger.info("所有关键cookie字段都存在，将以登录用户身份连接")
-            else:
-                bilibili_logger.warning("未找到有效的cookie数据")
-        else:
+        Returns:
+            Optional[Credential]: 认证凭据，没有可用cookie时返回None
+        """
+        if not cookies:
             bilibili_logger.info("未提供cookies，将以访客身份连接弹幕服务器")
-            
+            return None
+        
+        def cookie(key: str) -> str:
+            # 只接受字符串值，忽略用户信息等非cookie字段
+            value = cookies.get(key)
+            return value if type(value) is str else ''
+        
+        kwargs = {name: cookie(key) for name, key in _CREDENTIAL_FIELDS}
+        if not any(kwargs.values()):
+            bilibili_logger.warning("未找到有效的cookie数据")
+            return None
+        
+        credential = Credential(**kwargs)
+        
+        # 如果缺少关键字段，警告但仍然尝试连接
+        if not credential.sessdata or not credential.bili_jct:
+            bilibili_logger.warning("缺少关键cookie字段，可能无法以登录用户身份连接")
+        
         return credential
     
     def _register_event_handlers(self):
-        """注册事件处理器"""
+        """注册事件处理器（每个LiveDanmaku实例只注册一次）"""
+        if self._handlers_registered_on is self.live_danmaku:
+            return
+        
         bilibili_logger.operation_start("注册事件处理器")
+        for event_name, handler_name in self._HANDLERS:
+            self.live_danmaku.on(event_name)(getattr(self, handler_name))
+        self._handlers_registered_on = self.live_danmaku
+        bilibili_logger.debug("事件处理器注册完成")
+    
+    async def _handle_verification(self, event):
+        """弹幕服务器认证成功处理"""
+        bilibili_logger.operation_complete("弹幕服务器认证", "成功")
+        # 连接已稳定，重置重连计数
+        self._reconnect_count = 0
         
-        @self.live_danmaku.on('DANMU_MSG')
-        async def on_danmaku(event):
-            """弹幕消息处理"""
-            try:
-                info = event['data']['info']
-                username = info[2][1]  # 用户名
-                message = info[1]      # 弹幕内容
-                uid = info[2][0]       # 用户ID
-                
+        # 检查是否以登录用户身份连接
+        if self._credential and self._credential.sessdata:
+            bilibili_logger.info("已以登录用户身份连接到弹幕服务器")
+            self.status_changed.emit(f"✅ 已以登录用户身份连接到直播间 {self.room_id}")
+        else:
+            bilibili_logger.info("已以访客身份连接到弹幕服务器")
+            self.status_changed.emit(f"✅ 已以访客身份连接到直播间 {self.room_id}")
+    
+    async def _handle_interact_word(self, event):
+        """用户进入直播间事件"""
+        try:
+            data = event['data']['data']
+            username = data.get('uname', '未知用户')
+            msg_type = data.get('msg_type', 1)
+            
+            if msg_type == 1 and bilibili_logger.isEnabledFor(logging.DEBUG):  # 进入直播间
+                bilibili_logger.debug("用户进入直播间", username)
+        except Exception:
+            if self._tb_limiter.allow():
+                bilibili_logger.exception("处理用户进入事件异常")
+    
+    async def _handle_danmu(self, event):
+        """弹幕消息处理"""
+        try:
+            info = event['data']['info']
+            message = info[1]          # 弹幕内容
+            user = info[2]
+            uid, username = user[0], user[1]  # 用户ID、用户名
+            
+            if bilibili_logger.isEnabledFor(logging.DEBUG):
                 bilibili_logger.debug("弹幕消息", f"{username}: {message}")
-                
-                message_info = MessageInfo(
-                    Constants.MESSAGE_TYPE_DANMAKU,
-                    username,
-                    get_current_timestamp(),
-                    message=message,
-                    uid=uid,
-                    color=Constants.COLOR_DANMAKU
-                )
-                self._on_message(message_info)
-            except Exception as e:
-                bilibili_logger.error("处理弹幕消息异常", str(e))
-        
-        @self.live_danmaku.on('SEND_GIFT')
-        async def on_gift(event):
-            """礼物消息处理"""
-            try:
-                data = event['data']['data']
-                username = data['uname']
-                gift_name = data['giftName']
-                num = data['num']
-                uid = data['uid']
-                
+            
+            message_info = MessageInfo(
+                Constants.MESSAGE_TYPE_DANMAKU,
+                username,
+                get_current_timestamp(),
+                message=message,
+                uid=uid,
+                color=Constants.COLOR_DANMAKU
+            )
+            self._on_message(message_info)
+        except Exception:
+            if self._tb_limiter.allow():
+                bilibili_logger.exception("处理弹幕消息异常")
+    
+    async def _handle_gift(self, event):
+        """礼物消息处理"""
+        try:
+            data = event['data']['data']
+            username = data['uname']
+            gift_name = data['giftName']
+            num = data['num']
+            uid = data['uid']
+            
+            if bilibili_logger.isEnabledFor(logging.DEBUG):
                 bilibili_logger.debug("礼物消息", f"{username} 送出 {gift_name} x{num}")
-                
-                message_info = MessageInfo(
-                    Constants.MESSAGE_TYPE_GIFT,
-                    username,
-                    get_current_timestamp(),
-                    gift_name=gift_name,
-                    num=num,
-                    uid=uid
-                )
-                self._on_message(message_info)
-            except Exception as e:
-                bilibili_logger.error("处理礼物消息异常", str(e))
-        
-        # 添加连接状态监听
-        @self.live_danmaku.on('LIVE')
-        async def on_live_status(event):
-            """直播状态事件"""
-            try:
-                # 只记录关键状态信息
+            
+            message_info = MessageInfo(
+                Constants.MESSAGE_TYPE_GIFT,
+                username,
+                get_current_timestamp(),
+                gift_name=gift_name,
+                num=num,
+                uid=uid
+            )
+            self._on_message(message_info)
+        except Exception:
+            if self._tb_limiter.allow():
+                bilibili_logger.exception("处理礼物消息异常")
+    
+    async def _handle_live_status(self, event):
+        """直播状态事件"""
+        try:
+            # 只记录关键状态信息
+            if bilibili_logger.isEnabledFor(logging.DEBUG):
                 status = event.get('data', {}).get('live_status', 'unknown')
                 bilibili_logger.debug("直播状态变更", f"状态: {status}")
-            except Exception as e:
-                bilibili_logger.error("处理直播状态异常", str(e))
-        
-        # 添加心跳监听来确认连接正常
-        @self.live_danmaku.on('HEARTBEAT')
-        async def on_heartbeat(event):
-            """心跳事件"""
+        except Exception:
+            if self._tb_limiter.allow():
+                bilibili_logger.exception("处理直播状态异常")
+    
+    async def _handle_heartbeat(self, event):
+        """心跳事件"""
+        if bilibili_logger.isEnabledFor(logging.DEBUG):
             bilibili_logger.debug("收到心跳包，连接正常")
-        
-        bilibili_logger.debug("事件处理器注册完成")
-        
-        @self.live_danmaku.on('GUARD_BUY')
-        async def on_guard(event):
-            """舰长购买消息处理"""
-            try:
-                data = event['data']['data']
-                username = data['username']
-                guard_level = data['guard_level']
-                num = data['num']
-                uid = data['uid']
-                
-                # 获取舰长等级名称
-                guard_name = {1: "舰长", 2: "提督", 3: "总督"}.get(guard_level, f"等级{guard_level}")
-                bilibili_logger.info("舰长购买", f"{username} 购买了 {num}个月{guard_name}")
-                
-                message_info = MessageInfo(
-                    Constants.MESSAGE_TYPE_GUARD,
-                    username,
-                    get_current_timestamp(),
-                    guard_level=guard_level,
-                    num=num,
-                    uid=uid
-                )
-                self._on_message(message_info)
-            except Exception as e:
-                bilibili_logger.error("处理舰长消息异常", str(e))
-        
-        @self.live_danmaku.on('SUPER_CHAT_MESSAGE')
-        async def on_super_chat(event):
-            """醒目留言处理"""
-            try:
-                data = event['data']['data']
-                username = data['user_info']['uname']
-                message = data['message']
-                price = data['price']
-                uid = data['uid']
-                
-                bilibili_logger.info("醒目留言", f"{username} (¥{price}): {message}")
-                
-                message_info = MessageInfo(
-                    Constants.MESSAGE_TYPE_SUPER_CHAT,
-                    username,
-                    get_current_timestamp(),
-                    message=message,
-                    price=price,
-                    uid=uid
-                )
-                self._on_message(message_info)
-            except Exception as e:
-                bilibili_logger.error("处理醒目留言异常", str(e))
-        
-        @self.live_danmaku.on('DISCONNECT')
-        async def on_disconnect(event):
-            """断开连接处理"""
-            bilibili_logger.info("连接断开", str(event))
-            if self.running:  # 只有在运行状态下才触发重连                self.status_changed.emit("连接已断开，尝试重连...")
-                self._reconnect_count += 1
+    
+    async def _handle_guard(self, event):
+        """舰长购买消息处理"""
+        try:
+            data = event['data']['data']
+            username = data['username']
+            guard_level = data['guard_level']
+            num = data['num']
+            uid = data['uid']
+            
+            # 获取舰长等级名称
+            guard_name = GUARD_NAMES.get(guard_level) or f"等级{guard_level}"
+            bilibili_logger.info("舰长购买", f"{username} 购买了 {num}个月{guard_name}")
+            
+            message_info = MessageInfo(
+                Constants.MESSAGE_TYPE_GUARD,
+                username,
+                get_current_timestamp(),
+                guard_level=guard_level,
+                num=num,
+                uid=uid
+            )
+            self._on_message(message_info)
+        except Exception:
+            if self._tb_limiter.allow():
+                bilibili_logger.exception("处理舰长消息异常")
+    
+    async def _handle_super_chat(self, event):
+        """醒目留言处理"""
+        try:
+            data = event['data']['data']
+            username = data['user_info']['uname']
+            message = data['message']
+            price = data['price']
+            uid = data['uid']
+            
+            bilibili_logger.info("醒目留言", f"{username} (¥{price}): {message}")
+            
+            message_info = MessageInfo(
+                Constants.MESSAGE_TYPE_SUPER_CHAT,
+                username,
+                get_current_timestamp(),
+                message=message,
+                price=price,
+                uid=uid
+            )
+            self._on_message(message_info)
+        except Exception:
+            if self._tb_limiter.allow():
+                bilibili_logger.exception("处理醒目留言异常")
+    
+    async def _handle_disconnect(self, event):
+        """断开连接处理"""
+        bilibili_logger.info("连接断开", str(event))
+        if self.running:  # 只有在运行状态下才触发重连
+            self.status_changed.emit("连接已断开，尝试重连...")
+            self._reconnect_count += 1
     
     def _on_message(self, message_info: MessageInfo):
         """处理接收到的消息"""
         try:
-            # 根据消息类型记录不同级别的日志
-            msg_type = message_info.type
-            username = message_info.username
+            # 只序列化一次，日志与信号共用
+            payload = message_info.to_dict()
             
-            if msg_type == Constants.MESSAGE_TYPE_DANMAKU:
-                # 弹幕消息使用DEBUG级别，避免日志过多
-                message_content = message_info.to_dict().get('message', '')
-                bilibili_logger.debug("处理弹幕消息", f"{username}: {message_content}")
-            elif msg_type == Constants.MESSAGE_TYPE_GUARD:
-                # 舰长消息使用INFO级别，这是重要事件
-                guard_level = message_info.to_dict().get('guard_level', 0)
-                guard_name = {1: "舰长", 2: "提督", 3: "总督"}.get(guard_level, f"等级{guard_level}")
-                bilibili_logger.info("处理舰长消息", f"{username} 购买{guard_name}")
-            elif msg_type == Constants.MESSAGE_TYPE_GIFT:
-                # 礼物消息使用DEBUG级别
-                gift_info = message_info.to_dict()
-                gift_name = gift_info.get('gift_name', '未知礼物')
-                num = gift_info.get('num', 1)
-                bilibili_logger.debug("处理礼物消息", f"{username} 送出 {gift_name} x{num}")
-            elif msg_type == Constants.MESSAGE_TYPE_SUPER_CHAT:
-                # 醒目留言使用INFO级别
-                sc_info = message_info.to_dict()
-                price = sc_info.get('price', 0)
-                bilibili_logger.info("处理醒目留言", f"{username} (¥{price})")
+            # 根据消息类型记录不同级别的日志
+            _DISPATCH.get(message_info.type, _log_default)(payload)
             
-            # 通过信号发送消息到主线程（保持兼容性，使用字典格式）
-            self.message_received.emit(message_info.to_dict())
-        except Exception as e:
-            bilibili_logger.error("消息处理异常", str(e))
+            # 交给批量发送循环，合并后再跨线程发送到主线程
+            self._out_queue.put_nowait(payload)
+        except Exception:
+            if self._tb_limiter.allow():
+                bilibili_logger.exception("消息处理异常")
     
     def stop_monitoring(self):
-        """停止监控"""
+        """停止监控（立即返回，停止完成后发出stopped信号）"""
+        self._request_stop()
+    
+    def stop_monitoring_blocking(self, timeout: float = Constants.MONITOR_STOP_TIMEOUT):
+        """
+        停止监控并等待客户端断开（用于程序退出等需要同步的场景）
+        
+        Args:
+            timeout (float): 最长等待时间（秒）
+        """
+        future = self._request_stop()
+        if future is None:
+            return
+        try:
+            future.result(timeout=timeout)
+        except Exception as e:
+            bilibili_logger.error("停止监控异常", str(e))
+    
+    def _request_stop(self) -> Optional[concurrent.futures.Future]:
+        """
+        请求停止监控
+        
+        Returns:
+            Optional[Future]: 停止客户端的任务，无需停止时返回None
+        """
         try:
             bilibili_logger.operation_start("停止弹幕监控")
             self.running = False
+            future = None
             if self.loop and self.loop.is_running() and self.live_danmaku:
                 # 在事件循环中停止客户端
                 future = asyncio.run_coroutine_threadsafe(self._stop_client(), self.loop)
-                future.result(timeout=Constants.MONITOR_STOP_TIMEOUT)  # 等待最多5秒
+                future.add_done_callback(lambda _: self.stopped.emit())
+            # 取消主协程：连接建立前（如正在获取直播间信息）请求停止时也能结束，
+            # 同时让run()中阻塞等待的线程退出
+            if self._future is not None:
+                self._future.cancel()
+            if future is not None:
+                return future
         except Exception as e:
             bilibili_logger.error("停止监控异常", str(e))
+        self.stopped.emit()
+        return None
     
     async def _stop_client(self):
         """异步停止客户端"""
@@ -418,15 +556,6 @@ class DanmakuMonitorThread(QThread):
         except Exception as e:
             bilibili_logger.error("停止客户端异常", str(e))
     
-    def _cleanup_loop(self):
-        """清理事件循环"""
-        try:
-            if self.loop and not self.loop.is_closed():
-                self.loop.close()
-                bilibili_logger.debug("事件循环已清理")
-        except Exception as e:
-            bilibili_logger.error("关闭事件循环异常", str(e))
-    
     def set_max_reconnect_attempts(self, attempts: int):
         """设置最大重连次数"""
         self._max_reconnect_attempts = max(1, attempts)
@@ -4,158 +4,221 @@
 B站登录模块 - 处理二维码登录功能
 """
 
+import os
 import json
-import time
+import asyncio
+import concurrent.futures
 from io import BytesIO
 from typing import Optional, Dict, Any
 
-import requests
+import aiohttp
 import qrcode
-from PyQt6.QtCore import QThread, pyqtSignal
+from PyQt6.QtCore import QObject, pyqtSignal
 from PyQt6.QtGui import QPixmap
 
 from models import UserInfo
 from config import Constants
 from utils import safe_json_load, safe_json_save
+from .runtime import AsyncRuntime
 
+# 优先使用orjson解析接口响应（其JSONDecodeError继承自json.JSONDecodeError）
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
 
-class QRLoginThread(QThread):
-    """二维码登录线程"""
-    
-    # 信号定义
-    update_status = pyqtSignal(str)    # 状态更新信号
-    login_success = pyqtSignal(dict)   # 登录成功信号
-    login_failed = pyqtSignal(str)     # 登录失败信号
+
+# 二维码PNG编码缓冲区（仅在界面线程中使用，重复利用）
+_QR_BUFFER = BytesIO()
+
+
+async def poll_qr(qr_key: str, session: aiohttp.ClientSession, signals: "QRLoginThread") -> None:
+    """
+    轮询二维码扫码状态
+
+    Args:
+        qr_key (str): 二维码密钥
+        session (aiohttp.ClientSession): 共享的HTTP会话
+        signals (QRLoginThread): 用于发送状态信号的对象
+    """
+    delay = Constants.LOGIN_POLL_INITIAL_DELAY
+    last_code = Constants.QR_CODE_NOT_SCANNED
+    etag = None
     
-    def __init__(self, qr_key: str):
-        """
-        初始化登录线程
-        
-        Args:
-            qr_key (str): 二维码密钥
-        """
-        super().__init__()
-        self.qr_key = qr_key
-        self.is_running = True
-        
-    def run(self):
-        """轮询二维码扫码状态"""
-        while self.is_running:
-            try:
-                resp = requests.get(
-                    Constants.BILIBILI_LOGIN_POLL_URL,
-                    params={"qrcode_key": self.qr_key},
-                    headers=Constants.DEFAULT_HEADERS,
-                    timeout=Constants.HTTP_TIMEOUT
-                )
-                
-                if resp.status_code != 200:
-                    self.login_failed.emit(f"查询扫码状态失败: HTTP状态码 {resp.status_code}")
-                    break
-                
-                try:
-                    data = resp.json()
-                except json.JSONDecodeError as e:
-                    self.login_failed.emit(f"响应格式错误: {str(e)}")
-                    break
-                
-                if data["code"] != 0:
-                    self.login_failed.emit(f"查询扫码状态失败: {data['message']}")
-                    break
+    while signals.is_running:
+        try:
+            # 默认请求头由共享会话提供，这里只附加条件请求头
+            headers = {'If-None-Match': etag} if etag else None
+            
+            async with session.get(
+                Constants.BILIBILI_LOGIN_POLL_URL,
+                params={"qrcode_key": qr_key},
+                headers=headers
+            ) as resp:
+                if resp.status == 304:  # 状态未变化，沿用上次结果
+                    info = {}
+                    code = last_code
+                else:
+                    if resp.status != 200:
+                        signals.login_failed.emit(f"查询扫码状态失败: HTTP状态码 {resp.status}")
+                        break
+                    
+                    etag = resp.headers.get('ETag', etag)
+                    
+                    try:
+                        data = _json_loads(await resp.read())
+                    except json.JSONDecodeError as e:
+                        signals.login_failed.emit(f"响应格式错误: {str(e)}")
+                        break
                     
-                info = data["data"]
-                code = info["code"]
+                    if data["code"] != 0:
+                        signals.login_failed.emit(f"查询扫码状态失败: {data['message']}")
+                        break
+                    
+                    info = data["data"]
+                    code = info["code"]
                 
                 if code == Constants.QR_CODE_SUCCESS:  # 已扫码并确认
-                    self.update_status.emit("登录成功！获取用户信息...")
-                    cookies = self._extract_cookies(resp)
+                    signals.update_status.emit("登录成功！获取用户信息...")
+                    cookies = _extract_cookies(resp)
                     
                     try:
-                        user_info = self._get_user_info(cookies)
+                        user_info = await _get_user_info(session, cookies)
                         cookies["user_info"] = user_info.to_dict()
-                        self.login_success.emit(cookies)
+                        signals.login_success.emit(cookies)
                     except Exception as e:
-                        self.login_failed.emit(f"获取用户信息失败: {str(e)}")
+                        signals.login_failed.emit(f"获取用户信息失败: {str(e)}")
                     break
                     
                 elif code == Constants.QR_CODE_EXPIRED:  # 二维码已失效
-                    self.login_failed.emit("二维码已失效，请重新获取")
+                    signals.login_failed.emit("二维码已失效，请重新获取")
                     break
                     
                 elif code == Constants.QR_CODE_SCANNED:  # 已扫码，等待确认
-                    self.update_status.emit("已扫码，请在手机上确认登录")
+                    if last_code != code:
+                        signals.update_status.emit("已扫码，请在手机上确认登录")
+                    # 确认通常很快到达，缩短轮询间隔
+                    delay = Constants.LOGIN_POLL_SCANNED_DELAY
                 elif code == Constants.QR_CODE_NOT_SCANNED:  # 未扫码
-                    pass
+                    # 长时间未扫码时逐步放慢轮询
+                    delay = min(delay * Constants.LOGIN_POLL_BACKOFF, Constants.LOGIN_POLL_MAX_DELAY)
                 else:  # 其他状态
-                    self.update_status.emit(f"状态更新: {info.get('message', '未知状态')}")
-                    
-                time.sleep(Constants.LOGIN_POLL_INTERVAL)  # 每2秒检查一次
+                    signals.update_status.emit(f"状态更新: {info.get('message', '未知状态')}")
                 
-            except Exception as e:
-                self.login_failed.emit(f"登录过程出错: {str(e)}")
-                break
+                last_code = code
+            
+            await asyncio.sleep(delay)
+            
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            signals.login_failed.emit(f"登录过程出错: {str(e)}")
+            break
+
+
+def _extract_cookies(response: aiohttp.ClientResponse) -> Dict[str, str]:
+    """
+    从响应中提取cookies
+
+    Args:
+        response: HTTP响应对象
+
+    Returns:
+        Dict[str, str]: cookies字典
+    """
+    return {name: morsel.value for name, morsel in response.cookies.items()}
+
+
+async def _get_user_info(session: aiohttp.ClientSession, cookies: Dict[str, str]) -> UserInfo:
+    """
+    获取用户信息
+
+    Args:
+        session (aiohttp.ClientSession): 共享的HTTP会话
+        cookies (Dict[str, str]): cookies字典
+
+    Returns:
+        UserInfo: 用户信息对象
+
+    Raises:
+        Exception: 获取用户信息失败时抛出
+    """
+    try:
+        async with session.get(
+            Constants.BILIBILI_NAV_URL,
+            cookies=cookies
+        ) as resp:
+            if resp.status != 200:
+                raise Exception(f"HTTP状态码错误: {resp.status}")
+
+            try:
+                data = _json_loads(await resp.read())
+            except json.JSONDecodeError as e:
+                raise Exception(f"JSON解析错误: {str(e)}")
+
+        if data["code"] == 0:
+            user_data = data["data"]
+            return UserInfo(
+                uname=user_data.get("uname", ""),
+                uid=user_data.get("mid", 0),
+                face=user_data.get("face", ""),
+                level=user_data.get("level_info", {}).get("current_level", 0)
+            )
+        else:
+            raise Exception(data["message"])
+
+    except Exception as e:
+        raise Exception(f"获取用户信息失败: {str(e)}")
+
+
+class QRLoginThread(QObject):
+    """二维码登录轮询器 - 在共享事件循环中运行，通过信号通知界面"""
     
-    def _extract_cookies(self, response) -> Dict[str, str]:
+    # 信号定义
+    update_status = pyqtSignal(str)    # 状态更新信号
+    login_success = pyqtSignal(dict)   # 登录成功信号
+    login_failed = pyqtSignal(str)     # 登录失败信号
+    
+    def __init__(self, qr_key: str):
         """
-        从响应中提取cookies
+        初始化登录轮询器
         
         Args:
-            response: HTTP响应对象
-            
-        Returns:
-            Dict[str, str]: cookies字典
+            qr_key (str): 二维码密钥
         """
-        cookies = {}
-        for cookie in response.cookies:
-            cookies[cookie.name] = cookie.value
-        return cookies
+        super().__init__()
+        self.qr_key = qr_key
+        self.is_running = False
+        self._future: Optional[concurrent.futures.Future] = None
+    
+    def start(self):
+        """在共享事件循环中开始轮询"""
+        self.is_running = True
+        self._future = AsyncRuntime.instance().submit(self._run())
+    
+    async def _run(self):
+        """轮询入口协程"""
+        try:
+            session = await AsyncRuntime.instance().get_session()
+            await poll_qr(self.qr_key, session, self)
+        finally:
+            self.is_running = False
     
-    def _get_user_info(self, cookies: Dict[str, str]) -> UserInfo:
+    def isRunning(self) -> bool:
         """
-        获取用户信息
+        检查轮询是否仍在进行
         
-        Args:
-            cookies (Dict[str, str]): cookies字典
-            
         Returns:
-            UserInfo: 用户信息对象
-            
-        Raises:
-            Exception: 获取用户信息失败时抛出
+            bool: 是否正在轮询
         """
-        try:
-            resp = requests.get(
-                Constants.BILIBILI_NAV_URL,
-                cookies=cookies,
-                headers=Constants.DEFAULT_HEADERS,
-                timeout=Constants.HTTP_TIMEOUT
-            )
-            
-            if resp.status_code != 200:
-                raise Exception(f"HTTP状态码错误: {resp.status_code}")
-            
-            try:
-                data = resp.json()
-            except json.JSONDecodeError as e:
-                raise Exception(f"JSON解析错误: {str(e)}")
-            
-            if data["code"] == 0:
-                user_data = data["data"]
-                return UserInfo(
-                    uname=user_data.get("uname", ""),
-                    uid=user_data.get("mid", 0),
-                    face=user_data.get("face", ""),
-                    level=user_data.get("level_info", {}).get("current_level", 0)
-                )
-            else:
-                raise Exception(data["message"])
-                
-        except Exception as e:
-            raise Exception(f"获取用户信息失败: {str(e)}")
+        return self._future is not None and not self._future.done()
     
     def stop(self):
-        """停止线程"""
+        """停止轮询"""
         self.is_running = False
+        if self._future is not None:
+            self._future.cancel()
 
 
 class LoginManager:
@@ -171,6 +234,7 @@ class LoginManager:
         self.cookies_file = cookies_file
         self._cached_cookies = None
         self._cached_user_info = None
+        self._cached_mtime = 0  # 缓存对应的文件修改时间（纳秒）
     
     def get_qr_code(self) -> tuple[QPixmap, str]:
         """
@@ -183,19 +247,8 @@ class LoginManager:
             Exception: 获取二维码失败时抛出
         """
         try:
-            resp = requests.get(
-                Constants.BILIBILI_LOGIN_QR_URL,
-                headers=Constants.DEFAULT_HEADERS,
-                timeout=Constants.HTTP_TIMEOUT
-            )
-            
-            if resp.status_code != 200:
-                raise Exception(f"获取二维码失败: HTTP状态码 {resp.status_code}")
-            
-            try:
-                data = resp.json()
-            except json.JSONDecodeError as e:
-                raise Exception(f"响应格式错误: {str(e)}")
+            runtime = AsyncRuntime.instance()
+            data = runtime.submit(self._request_qr_code()).result(timeout=Constants.HTTP_TIMEOUT)
             
             if data["code"] != 0:
                 raise Exception(f"获取二维码失败: {data['message']}")
@@ -205,25 +258,42 @@ class LoginManager:
             qr_key = qr_info["qrcode_key"]
             
             # 生成二维码图片
-            qr = qrcode.QRCode(version=1, box_size=8, border=4)
-            qr.add_data(qr_code_url)
-            qr.make(fit=True)
+            qr_img = qrcode.make(qr_code_url, box_size=8, border=4)
             
-            qr_img = qr.make_image(fill_color="black", back_color="white")
-            
-            # 转换为QPixmap
-            buffer = BytesIO()
-            qr_img.save(buffer, format='PNG')
-            buffer.seek(0)
+            # 转换为QPixmap（复用PNG缓冲区，直接读取其内存避免复制）
+            _QR_BUFFER.seek(0)
+            _QR_BUFFER.truncate(0)
+            qr_img.save(_QR_BUFFER, format='PNG', optimize=False)
             
             pixmap = QPixmap()
-            pixmap.loadFromData(buffer.getvalue())
+            with _QR_BUFFER.getbuffer() as view:
+                pixmap.loadFromData(view)
             
             return pixmap, qr_key
             
         except Exception as e:
             raise Exception(f"获取二维码异常: {str(e)}")
     
+    async def _request_qr_code(self) -> Dict[str, Any]:
+        """
+        请求二维码生成接口
+        
+        Returns:
+            Dict: 接口返回的JSON数据
+            
+        Raises:
+            Exception: 请求失败时抛出
+        """
+        session = await AsyncRuntime.instance().get_session()
+        async with session.get(Constants.BILIBILI_LOGIN_QR_URL) as resp:
+            if resp.status != 200:
+                raise Exception(f"获取二维码失败: HTTP状态码 {resp.status}")
+            
+            try:
+                return _json_loads(await resp.read())
+            except json.JSONDecodeError as e:
+                raise Exception(f"响应格式错误: {str(e)}")
+    
     def load_saved_cookies(self) -> Optional[Dict[str, Any]]:
         """
         加载保存的cookies
@@ -231,9 +301,21 @@ class LoginManager:
         Returns:
             Optional[Dict]: cookies字典，如果加载失败返回None
         """
-        if self._cached_cookies is None:
-            self._cached_cookies = safe_json_load(self.cookies_file)
+        try:
+            mtime = os.stat(self.cookies_file).st_mtime_ns
+        except OSError:
+            self._cached_cookies = None
+            self._cached_user_info = None
+            self._cached_mtime = 0
+            return None
         
+        # 文件未变化时直接使用缓存
+        if mtime == self._cached_mtime and self._cached_cookies is not None:
+            return self._cached_cookies
+        
+        self._cached_cookies = safe_json_load(self.cookies_file)
+        self._cached_user_info = None
+        self._cached_mtime = mtime
         return self._cached_cookies
     
     def save_cookies(self, cookies: Dict[str, Any]) -> bool:
@@ -248,6 +330,10 @@ class LoginManager:
         """
         if safe_json_save(self.cookies_file, cookies):
             self._cached_cookies = cookies
+            try:
+                self._cached_mtime = os.stat(self.cookies_file).st_mtime_ns
+            except OSError:
+                self._cached_mtime = 0
             # 更新缓存的用户信息
             user_info_data = cookies.get("user_info")
             if user_info_data:
@@ -290,17 +376,37 @@ class LoginManager:
             # 清除缓存
             self._cached_cookies = None
             self._cached_user_info = None
+            self._cached_mtime = 0
+            
+            # 先原子地移走cookies文件，之后不会再读到旧的登录状态
+            pending_path = self.cookies_file + '.del'
+            try:
+                os.replace(self.cookies_file, pending_path)
+            except FileNotFoundError:
+                return True
             
-            # 删除cookies文件
-            import os
-            if os.path.exists(self.cookies_file):
-                os.remove(self.cookies_file)
+            # 实际删除放到后台执行，避免慢速磁盘阻塞界面
+            AsyncRuntime.instance().submit(self._remove_file(pending_path))
             
             return True
         except Exception as e:
             print(f"登出失败: {str(e)}")
             return False
     
+    @staticmethod
+    async def _remove_file(path: str):
+        """
+        在线程池中删除文件
+        
+        Args:
+            path (str): 文件路径
+        """
+        try:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, os.remove, path)
+        except Exception as e:
+            print(f"删除cookies文件失败: {str(e)}")
+    
     def get_cookies(self) -> Optional[Dict[str, Any]]:
         """
         获取当前cookies
@@ -326,17 +432,34 @@ class LoginManager:
         if not cookies:
             return False
         
-        # 检查必要的cookie字段
-        required_fields = ['SESSDATA', 'bili_jct']
-        for field in required_fields:
-            if field not in cookies or not cookies[field]:
-                return False
+        return self._has_required_fields(cookies)
+    
+    @staticmethod
+    def _has_required_fields(cookies: Dict[str, Any]) -> bool:
+        """
+        检查必要的cookie字段和用户信息是否存在
         
-        # 检查用户信息
-        if 'user_info' not in cookies:
-            return False
+        Args:
+            cookies (Dict): cookies字典
+            
+        Returns:
+            bool: 是否包含全部必要字段
+        """
+        return bool(cookies.get('SESSDATA')) and bool(cookies.get('bili_jct')) and 'user_info' in cookies
+    
+    @staticmethod
+    async def _request_user_info(cookies: Dict[str, str]) -> UserInfo:
+        """
+        使用共享会话请求用户信息
         
-        return True
+        Args:
+            cookies (Dict): cookies字典
+            
+        Returns:
+            UserInfo: 用户信息对象
+        """
+        session = await AsyncRuntime.instance().get_session()
+        return await _get_user_info(session, cookies)
     
     def _fetch_user_info(self, cookies: Dict[str, str]) -> Optional[UserInfo]:
         """
@@ -349,30 +472,10 @@ class LoginManager:
             Optional[UserInfo]: 用户信息对象
         """
         try:
-            # 构建cookie字符串
-            cookie_str = '; '.join([f"{k}={v}" for k, v in cookies.items()])
-            headers = {
-                **Constants.DEFAULT_HEADERS,
-                'Cookie': cookie_str
-            }
-            
-            resp = requests.get(
-                'https://api.bilibili.com/x/web-interface/nav',
-                headers=headers,
-                timeout=Constants.HTTP_TIMEOUT
-            )
-            
-            if resp.status_code == 200:
-                data = resp.json()
-                if data['code'] == 0:
-                    user_data = data['data']
-                    return UserInfo(
-                        mid=user_data.get('mid', 0),
-                        uname=user_data.get('uname', ''),
-                        face=user_data.get('face', ''),
-                        vip_type=user_data.get('vipType', 0),
-                        level=user_data.get('level_info', {}).get('current_level', 0)
-                    )
+            # 只携带cookie值，忽略保存的用户信息等字段
+            cookie_data = {k: v for k, v in cookies.items() if isinstance(v, str)}
+            future = AsyncRuntime.instance().submit(self._request_user_info(cookie_data))
+            return future.result(timeout=Constants.HTTP_TIMEOUT)
         except Exception:
             pass
         
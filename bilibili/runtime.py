@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+异步运行时模块 - 提供进程级共享的asyncio事件循环和HTTP会话
+"""
+
+import ssl
+import asyncio
+import threading
+import concurrent.futures
+from typing import Optional, Coroutine, Any
+
+import aiohttp
+
+from config import Constants
+from ._http import AIOHTTP_HEADERS
+
+
+class AsyncRuntime:
+    """共享的后台asyncio事件循环（进程级单例）"""
+
+    _instance: Optional["AsyncRuntime"] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self):
+        """初始化事件循环并在守护线程中运行"""
+        self.loop = asyncio.new_event_loop()
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._ssl_context = ssl.create_default_context()
+        self._thread = threading.Thread(
+            target=self._run_loop,
+            name="AsyncRuntime",
+            daemon=True
+        )
+        self._thread.start()
+
+    @classmethod
+    def instance(cls) -> "AsyncRuntime":
+        """
+        获取共享运行时实例（首次调用时创建）
+
+        Returns:
+            AsyncRuntime: 运行时实例
+        """
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def _run_loop(self):
+        """事件循环线程入口"""
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coro: Coroutine[Any, Any, Any]) -> concurrent.futures.Future:
+        """
+        将协程提交到共享事件循环
+
+        Args:
+            coro: 要执行的协程
+
+        Returns:
+            concurrent.futures.Future: 可在其他线程等待的结果
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        """
+        获取共享的HTTP会话（必须在事件循环内调用）
+
+        Returns:
+            aiohttp.ClientSession: 复用连接的HTTP会话
+        """
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit_per_host=8,
+                    keepalive_timeout=60,
+                    ssl=self._ssl_context
+                ),
+                timeout=aiohttp.ClientTimeout(total=Constants.HTTP_TIMEOUT),
+                headers=AIOHTTP_HEADERS,
+                # 登录cookies按请求显式传入，不在会话中累积
+                cookie_jar=aiohttp.DummyCookieJar()
+            )
+        return self._session
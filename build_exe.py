@@ -6,14 +6,27 @@ PyInstaller 打包脚本 - 子轩专属排队工具
 """
 
 import os
+import re
 import sys
-import shutil
-import subprocess
+import json
+import hashlib
+import functools
+import argparse
 import datetime
+import importlib.metadata
+import fnmatch
+from glob import glob
 from pathlib import Path
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
-# 项目信息 - 从 version_info.py 获取
-from version_info import APP_NAME, APP_VERSION, APP_AUTHOR
+# 项目信息 - 从 version_info.py 获取（缺失时使用默认值，保证 --help 等路径可用）
+try:
+    from version_info import APP_NAME, APP_VERSION, APP_AUTHOR
+except ImportError:
+    APP_NAME = "子轩专属排队工具"
+    APP_VERSION = "0.0.0"
+    APP_AUTHOR = "BiliBili-XiaYun"
 
 PROJECT_NAME = APP_NAME
 EXECUTABLE_NAME = APP_NAME  
@@ -72,8 +85,21 @@ EXCLUDES = [
 ]
 
 
+# 不使用UPX压缩的二进制文件（体积大、压缩耗时且会拖慢启动）
+UPX_EXCLUDE = [
+    "Qt6Core.dll",
+    "Qt6Gui.dll",
+    "Qt6Widgets.dll",
+    "Qt6Network.dll",
+    "python3*.dll",
+    "vcruntime*.dll",
+    "msvcp*.dll",
+]
+
+
 def clean_build_dirs():
     """清理构建目录"""
+    import shutil
     print("🧹 清理构建目录...")
     
     # 确保打包根目录存在
@@ -90,47 +116,116 @@ def clean_build_dirs():
             except Exception as e:
                 print(f"   ⚠️ 清理失败: {dir_path} - {e}")
     
-    # 清理 __pycache__ 和 .pyc 文件
-    print("🧹 清理Python缓存文件...")
-    for root, dirs, files in os.walk(CURRENT_DIR):
-        # 删除 __pycache__ 目录
-        if "__pycache__" in dirs:
-            pycache_path = Path(root) / "__pycache__"
-            try:
-                shutil.rmtree(pycache_path)
-                print(f"   ✅ 删除: {pycache_path}")
-            except:
-                pass
+    # __pycache__ 保留给 compileall/PyInstaller 复用，只清理脱离源码的遗留 .pyc 文件
+    print("🧹 清理遗留的Python编译文件...")
+    to_delete_files = []
+    _collect_stray_bytecode(str(CURRENT_DIR), to_delete_files)
+    
+    # 删除操作均为阻塞I/O，使用线程池并发执行
+    with ThreadPoolExecutor(max_workers=32) as executor:
+        removed_pycs = sum(executor.map(_try_remove_file, to_delete_files))
+    print(f"   ✅ 删除 {removed_pycs} 个遗留 .pyc 文件")
+
+
+# 设置环境变量 BUILD_VERBOSE 时逐项输出清理详情
+BUILD_VERBOSE = bool(os.environ.get('BUILD_VERBOSE'))
+
+# 编译缓存文件后缀
+PYC_SUFFIXES = ('.pyc', '.pyo')
+
+# 预编译时跳过的目录
+COMPILE_EXCLUDE_RE = re.compile(r'[\\/](build|dist|\.venv|\.git)[\\/]')
+
+
+# 遍历源码时不进入的目录（缓存、版本库、资源和构建输出）
+PRUNE_DIRS = {"__pycache__", ".git", ".venv", "node_modules", "打包", "build", "dist", "resource"}
+PRUNE_PATHS = {str(BUILD_DIR), str(DIST_DIR)}
+
+
+def _is_pruned(entry):
+    """判断目录项是否应跳过（不再向下遍历）"""
+    return entry.name in PRUNE_DIRS or entry.path in PRUNE_PATHS
+
+
+def _collect_stray_bytecode(dir_path, to_delete_files):
+    """递归收集 __pycache__ 之外的 .pyc 文件（跳过无关目录）"""
+    try:
+        with os.scandir(dir_path) as it:
+            entries = list(it)
+    except OSError:
+        return
+    
+    for entry in entries:
+        if _is_pruned(entry):
+            continue
         
-        # 删除 .pyc 文件
-        for file in files:
-            if file.endswith(('.pyc', '.pyo')):
-                pyc_path = Path(root) / file
-                try:
-                    pyc_path.unlink()
-                    print(f"   ✅ 删除: {pyc_path}")
-                except:
-                    pass
+        if entry.is_dir(follow_symlinks=False):
+            _collect_stray_bytecode(entry.path, to_delete_files)
+        elif entry.name.endswith(PYC_SUFFIXES):
+            to_delete_files.append(entry.path)
+
+
+def _try_remove_file(path):
+    """删除文件，忽略错误，返回是否删除成功"""
+    try:
+        os.unlink(path)
+        if BUILD_VERBOSE:
+            print(f"   ✅ 删除: {path}")
+        return True
+    except:
+        return False
+
+
+def precompile_sources():
+    """使用多进程预编译项目源码，供PyInstaller直接复用字节码"""
+    import compileall
+    print("⚙️ 预编译Python源码...")
+    # workers=0 表示使用 os.cpu_count() 个进程；未修改的源码不会重新编译
+    if compileall.compile_dir(str(CURRENT_DIR), quiet=1, workers=0, rx=COMPILE_EXCLUDE_RE):
+        print("   ✅ 预编译完成")
+    else:
+        print("   ⚠️ 部分文件编译失败，PyInstaller将自行处理")
+
+
+def _normalize_dist_name(name):
+    """按PEP 503规范化发行包名（忽略大小写及 -_. 差异）"""
+    return re.sub(r'[-_.]+', '-', name).lower()
+
+
+def _installed_dist_versions():
+    """
+    扫描已安装的发行包及其版本
+    
+    Returns:
+        list: 按包名排序的 (规范化包名, 版本) 列表
+    """
+    return sorted({
+        (_normalize_dist_name(dist.metadata['Name']), dist.version)
+        for dist in importlib.metadata.distributions()
+        if dist.metadata['Name']
+    })
 
 
 def check_dependencies():
     """检查依赖是否安装"""
     print("🔍 检查依赖...")
     
-    # 定义包名映射（pip包名 -> 导入名）
-    package_mapping = {
-        "PyQt6": "PyQt6",
-        "bilibili_api": "bilibili_api", 
-        "pyinstaller": "PyInstaller"
+    # 需要的发行包（pip包名）
+    required_packages = ["PyQt6", "bilibili-api-python", "pyinstaller"]
+    
+    # 一次扫描 site-packages 得到已安装的发行包名，逐个检查变为集合查找
+    installed = {
+        _normalize_dist_name(dist.metadata['Name'])
+        for dist in importlib.metadata.distributions()
+        if dist.metadata['Name']
     }
     
     missing_packages = []
     
-    for pip_name, import_name in package_mapping.items():
-        try:
-            __import__(import_name)
+    for pip_name in required_packages:
+        if _normalize_dist_name(pip_name) in installed:
             print(f"   ✅ {pip_name}")
-        except ImportError:
+        else:
             missing_packages.append(pip_name)
             print(f"   ❌ {pip_name}")
     
@@ -144,72 +239,58 @@ def check_dependencies():
     return True
 
 
-def create_spec_files():
-    """创建 PyInstaller spec 文件"""
-    print("📝 创建 PyInstaller spec 文件...")
-    return create_single_spec_file(MAIN_SCRIPT, EXECUTABLE_NAME)
+# PyInstaller spec 文件模板（花括号需成对转义）
+SPEC_TEMPLATE = '''# -*- mode: python ; coding: utf-8 -*-
+# {project_name} v{version} - PyInstaller配置文件
 
+from concurrent.futures import ThreadPoolExecutor
+from PyInstaller.utils.hooks import collect_submodules, collect_data_files
 
-def create_single_spec_file(main_script, executable_name):
-    """创建单个spec文件（向后兼容）"""
-    # 检查并构建存在的数据文件列表
-    valid_datas = []
-    for src, dst in DATA_FILES:
-        # 处理通配符路径
-        if '*' in src:
-            from glob import glob
-            matching_files = glob(src)
-            if matching_files:
-                valid_datas.append(f"('{src}', '{dst}')")
-                print(f"   ✅ 找到数据文件: {src} ({len(matching_files)} 个文件)")
-            else:
-                print(f"   ⚠️ 跳过数据文件: {src} (未找到匹配文件)")
-        else:
-            # 处理单个文件
-            src_path = CURRENT_DIR / src
-            if src_path.exists():
-                valid_datas.append(f"('{src}', '{dst}')")
-                print(f"   ✅ 找到数据文件: {src}")
-            else:
-                print(f"   ⚠️ 跳过数据文件: {src} (文件不存在)")
-    
-    datas_str = "[" + ",\n             ".join(valid_datas) + "]"
-    
-    # 构建隐式导入列表
-    hiddenimports_str = "[" + ",\n                    ".join([f"'{pkg}'" for pkg in HIDDEN_IMPORTS]) + "]"
-    
-    # 构建排除列表
-    excludes_str = "[" + ",\n             ".join([f"'{pkg}'" for pkg in EXCLUDES]) + "]"
-    
-    spec_content = f'''# -*- mode: python ; coding: utf-8 -*-
-# {PROJECT_NAME} v{VERSION} - PyInstaller配置文件
-# 生成时间: {datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+PYQT6_USED_MODULES = {{'PyQt6.QtCore', 'PyQt6.QtGui', 'PyQt6.QtWidgets', 'PyQt6.sip'}}
 
-from PyInstaller.utils.hooks import collect_all, collect_submodules
-import datetime
 
-# 收集所有bilibili_api模块
-try:
-    bilibili_datas, bilibili_binaries, bilibili_hiddenimports = collect_all('bilibili_api')
-except:
-    bilibili_datas, bilibili_binaries, bilibili_hiddenimports = [], [], []
+def collect_bilibili():
+    # 只收集程序实际用到的bilibili_api子模块及其数据文件
+    try:
+        hiddenimports = (collect_submodules('bilibili_api.live') +
+                         collect_submodules('bilibili_api.login'))
+        datas = collect_data_files('bilibili_api', includes=['**/*.json'])
+        return datas, [], hiddenimports
+    except:
+        return [], [], []
 
-# 收集PyQt6模块
-try:
-    pyqt6_datas, pyqt6_binaries, pyqt6_hiddenimports = collect_all('PyQt6')
-except:
-    pyqt6_datas, pyqt6_binaries, pyqt6_hiddenimports = [], [], []
+
+def collect_pyqt6():
+    # PyQt6的Qt库由PyInstaller自带hook处理，这里只补充用到的模块和平台、样式插件
+    try:
+        hiddenimports = collect_submodules('PyQt6', filter=lambda name: name in PYQT6_USED_MODULES)
+        datas = collect_data_files('PyQt6',
+                                   includes=['Qt6/plugins/platforms/*',
+                                             'Qt6/plugins/styles/*'],
+                                   excludes=['**/translations/**', '**/examples/**',
+                                             '**/qml/**', '**/Qt6Pdf*', '**/Qt6Bluetooth*'])
+        return datas, [], hiddenimports
+    except:
+        return [], [], []
+
+
+# 两个包的收集互不依赖，并行遍历
+with ThreadPoolExecutor(2) as _executor:
+    _bilibili = _executor.submit(collect_bilibili)
+    _pyqt6 = _executor.submit(collect_pyqt6)
+    bilibili_datas, bilibili_binaries, bilibili_hiddenimports = _bilibili.result()
+    pyqt6_datas, pyqt6_binaries, pyqt6_hiddenimports = _pyqt6.result()
 
 a = Analysis(
-    ['{main_script.name}'],
-    pathex=[r'{CURRENT_DIR}'],
+    ['{main_script_name}'],
+    pathex=[r'{current_dir}'],
     binaries=bilibili_binaries + pyqt6_binaries,
-    datas={datas_str} + bilibili_datas + pyqt6_datas,
-    hiddenimports={hiddenimports_str} + bilibili_hiddenimports + pyqt6_hiddenimports,
+    datas={datas} + bilibili_datas + pyqt6_datas,
+    hiddenimports={hiddenimports} + bilibili_hiddenimports + pyqt6_hiddenimports,
     hookspath=[],
     hooksconfig={{}},
     runtime_hooks=[],
-    excludes={excludes_str},
+    excludes={excludes},
     win_no_prefer_redirects=False,
     win_private_assemblies=False,
     cipher=None,
@@ -227,13 +308,13 @@ exe = EXE(
     debug=False,
     bootloader_ignore_signals=False,
     strip=False,
-    upx=True,
+    upx={upx},
     console=False,  # 设置为False隐藏控制台窗口
     disable_windowed_traceback=False,
     target_arch=None,
     codesign_identity=None,
     entitlements_file=None,
-    icon=r'{ICON_PATH}',
+    icon=r'{icon}',
     version_file=None,
 )
 
@@ -243,22 +324,399 @@ coll = COLLECT(
     a.zipfiles,
     a.datas,
     strip=False,
-    upx=True,
-    upx_exclude=[],
+    upx={upx},
+    upx_exclude={upx_exclude},
     name=r'{executable_name}',
 )
 '''
+
+
+def create_spec_files(use_upx=True):
+    """
+    创建 PyInstaller spec 文件
+    
+    Args:
+        use_upx: 是否使用UPX压缩（关闭可明显缩短打包时间，但输出体积更大）
+    """
+    print("📝 创建 PyInstaller spec 文件...")
+    return create_single_spec_file(MAIN_SCRIPT, EXECUTABLE_NAME, use_upx=use_upx)
+
+
+# 数据文件通配符匹配结果缓存
+DATAFILES_CACHE_FILE = BUILD_DIR / ".datafiles_cache.json"
+
+
+def _load_datafiles_cache():
+    """读取数据文件匹配缓存，不存在或损坏时返回空字典"""
+    try:
+        with open(DATAFILES_CACHE_FILE, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+        return cache if isinstance(cache, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_datafiles_cache(cache):
+    """写回数据文件匹配缓存"""
+    try:
+        DATAFILES_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with open(DATAFILES_CACHE_FILE, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, ensure_ascii=False)
+    except OSError as e:
+        print(f"   ⚠️ 写入数据文件缓存失败: {e}")
+
+
+def _cached_glob(src, cache):
+    """
+    匹配通配符数据文件，所在目录未修改时复用上次结果
+    
+    Args:
+        src: 相对于项目目录的通配符路径
+        cache: 缓存字典（会被更新）
+        
+    Returns:
+        list: 匹配到的文件列表
+    """
+    parent = os.path.join(str(CURRENT_DIR), os.path.dirname(src))
+    try:
+        mtime = os.stat(parent).st_mtime_ns
+    except OSError:
+        cache.pop(src, None)
+        return []
+    
+    entry = cache.get(src, {})
+    if entry.get('mtime') == mtime:
+        return entry.get('matches', [])
+    
+    matches = _expand_data_pattern(src)
+    cache[src] = {'mtime': mtime, 'matches': matches}
+    return matches
+
+
+def _expand_data_pattern(src):
+    """
+    展开数据文件通配符路径
+    
+    形如 "目录/*.后缀" 的浅层通配符只列出一次目录并按后缀过滤，
+    其他复杂模式回退到 glob
+    
+    Args:
+        src: 相对于项目目录的通配符路径
+        
+    Returns:
+        list: 匹配到的文件绝对路径列表
+    """
+    prefix, _, pattern = src.rpartition('/')
+    if any(ch in src for ch in '?[{') or '*' in prefix or pattern.count('*') != 1:
+        return glob(os.path.join(str(CURRENT_DIR), src))
+    
+    dir_path = os.path.join(str(CURRENT_DIR), prefix)
+    if pattern.startswith('*'):
+        suffix = pattern[1:]
+        match = lambda name: name.endswith(suffix)
+    else:
+        match = lambda name: fnmatch.fnmatchcase(name, pattern)
+    
+    try:
+        with os.scandir(dir_path) as it:
+            # 与glob一致，忽略隐藏文件
+            return [entry.path for entry in it
+                    if not entry.name.startswith('.') and match(entry.name)]
+    except OSError:
+        return []
+
+
+@functools.cache
+def _compute_spec_vars():
+    """
+    构建spec中的数据文件、隐式导入、排除和UPX排除列表（每次运行只计算一次）
+    
+    Returns:
+        tuple: (datas_str, hiddenimports_str, excludes_str, upx_exclude_str)
+    """
+    # 检查并构建存在的数据文件列表
+    valid_datas = []
+    glob_cache = _load_datafiles_cache()
+    dir_listings = {}
+    for src, dst in DATA_FILES:
+        # 处理通配符路径
+        if '*' in src:
+            matching_files = _cached_glob(src, glob_cache)
+            if matching_files:
+                valid_datas.append(f"('{src}', '{dst}')")
+                print(f"   ✅ 找到数据文件: {src} ({len(matching_files)} 个文件)")
+            else:
+                print(f"   ⚠️ 跳过数据文件: {src} (未找到匹配文件)")
+        else:
+            # 处理单个文件：同一目录只列出一次，再在内存中判断是否存在
+            parent, _, name = src.rpartition('/')
+            if parent not in dir_listings:
+                dir_listings[parent] = _list_file_names(os.path.join(str(CURRENT_DIR), parent))
+            if name in dir_listings[parent]:
+                valid_datas.append(f"('{src}', '{dst}')")
+                print(f"   ✅ 找到数据文件: {src}")
+            else:
+                print(f"   ⚠️ 跳过数据文件: {src} (文件不存在)")
+    
+    _save_datafiles_cache(glob_cache)
+    
+    datas_str = "[" + ",\n             ".join(valid_datas) + "]"
+    
+    # 构建隐式导入列表
+    hiddenimports_str = "[" + ",\n                    ".join([f"'{pkg}'" for pkg in HIDDEN_IMPORTS]) + "]"
+    
+    # 构建UPX排除列表
+    upx_exclude_str = "[" + ", ".join([f"'{name}'" for name in UPX_EXCLUDE]) + "]"
+    
+    # 构建排除列表
+    excludes_str = "[" + ",\n             ".join([f"'{pkg}'" for pkg in EXCLUDES]) + "]"
+    
+    return datas_str, hiddenimports_str, excludes_str, upx_exclude_str
+
+
+def _list_file_names(dir_path):
+    """列出目录中的文件名集合，目录不存在时返回空集合"""
+    try:
+        with os.scandir(dir_path) as it:
+            return {entry.name for entry in it if entry.is_file()}
+    except OSError:
+        return set()
+
+
+def create_single_spec_file(main_script, executable_name, use_upx=True):
+    """创建单个spec文件（向后兼容）"""
+    datas_str, hiddenimports_str, excludes_str, upx_exclude_str = _compute_spec_vars()
+    
+    spec_content = SPEC_TEMPLATE.format_map({
+        'project_name': PROJECT_NAME,
+        'version': VERSION,
+        'main_script_name': main_script.name,
+        'current_dir': CURRENT_DIR,
+        'datas': datas_str,
+        'hiddenimports': hiddenimports_str,
+        'excludes': excludes_str,
+        'executable_name': executable_name,
+        'icon': ICON_PATH,
+        'upx_exclude': upx_exclude_str,
+        'upx': use_upx,
+    })
     
     spec_file = CURRENT_DIR / f"{executable_name}.spec"
-    with open(spec_file, 'w', encoding='utf-8') as f:
-        f.write(spec_content)
+    new_bytes = spec_content.encode('utf-8')
+    
+    # 内容未变化时不重写，保留修改时间供增量构建判断
+    try:
+        if spec_file.read_bytes() == new_bytes:
+            print(f"   ✅ spec文件未变化: {spec_file}")
+            return [spec_file]
+    except OSError:
+        pass
+    
+    # 先写临时文件再原子替换，避免中断时留下半截spec
+    tmp_file = spec_file.with_suffix('.spec.tmp')
+    tmp_file.write_bytes(new_bytes)
+    os.replace(tmp_file, spec_file)
     
     print(f"   ✅ 创建完成: {spec_file}")
     return [spec_file]
 
 
-def run_pyinstaller(spec_files):
-    """运行PyInstaller打包多个spec文件"""
+# 上次成功构建的输入摘要
+BUILD_MANIFEST_FILE = DIST_DIR / ".build_manifest.json"
+
+
+def _tracked_input_files():
+    """收集影响打包结果的输入文件（源码、spec、版本信息和数据文件）"""
+    root = str(CURRENT_DIR)
+    files = [str(MAIN_SCRIPT), os.path.join(root, "version_info.py"),
+             os.path.join(root, f"{EXECUTABLE_NAME}.spec")]
+    
+    # 直接使用字符串路径，避免为每个文件构造Path对象
+    _collect_sources(root, files)
+    
+    glob_cache = _load_datafiles_cache()
+    for src, _ in DATA_FILES:
+        if '*' in src:
+            files.extend(_cached_glob(src, glob_cache))
+        else:
+            files.append(os.path.join(root, src))
+    
+    return files
+
+
+def _collect_sources(dir_path, sources):
+    """递归收集项目中的 .py 源文件（跳过缓存和隐藏目录）"""
+    try:
+        with os.scandir(dir_path) as it:
+            entries = list(it)
+    except OSError:
+        return
+    
+    for entry in entries:
+        if _is_pruned(entry) or entry.name.startswith('.'):
+            continue
+        if entry.is_dir(follow_symlinks=False):
+            _collect_sources(entry.path, sources)
+        elif entry.name.endswith('.py'):
+            sources.append(entry.path)
+
+
+def _inputs_hash() -> str:
+    """
+    计算打包输入的摘要（路径、修改时间、大小）
+    
+    Returns:
+        str: 十六进制摘要
+    """
+    records = []
+    for path in set(_tracked_input_files()):
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        records.append((path, st.st_mtime_ns, st.st_size))
+    
+    digest = hashlib.blake2b(digest_size=16)
+    for record in sorted(records):
+        digest.update(repr(record).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def is_build_up_to_date(inputs_hash, use_upx=True):
+    """
+    判断上次构建是否仍然有效
+    
+    Args:
+        inputs_hash: 当前输入摘要
+        use_upx: 本次是否使用UPX压缩（与上次不同时需要重新打包）
+        
+    Returns:
+        bool: 输入未变化且可执行文件存在时返回True
+    """
+    exe_path = DIST_DIR / EXECUTABLE_NAME / f"{EXECUTABLE_NAME}.exe"
+    if not exe_path.exists():
+        return False
+    try:
+        with open(BUILD_MANIFEST_FILE, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return (isinstance(manifest, dict)
+            and manifest.get('inputs_hash') == inputs_hash
+            and manifest.get('upx', True) == use_upx)
+
+
+def write_build_manifest(use_upx=True):
+    """记录本次成功构建的输入摘要"""
+    try:
+        with open(BUILD_MANIFEST_FILE, 'w', encoding='utf-8') as f:
+            json.dump({'inputs_hash': _inputs_hash(),
+                       'upx': use_upx,
+                       'version': VERSION}, f, ensure_ascii=False)
+    except OSError as e:
+        print(f"   ⚠️ 写入构建清单失败: {e}")
+
+
+# 跨构建复用的PyInstaller工作目录缓存（按spec内容、输入摘要和依赖版本寻址，每个spec只保留最新一份）
+BUILD_CACHE_DIR = Path.home() / ".cache" / "zixuan_build"
+
+
+def _workpath_cache_key(spec_file):
+    """
+    计算工作目录缓存键（spec文件内容 + 源文件输入摘要 + 已安装发行包版本）
+    
+    升级PyQt6等依赖后分析结果不再有效，因此包版本也计入缓存键
+    
+    Args:
+        spec_file: spec文件路径
+        
+    Returns:
+        str: 形如 "<spec名>-<摘要>" 的缓存目录名
+    """
+    digest = hashlib.blake2b(Path(spec_file).read_bytes(), digest_size=16)
+    digest.update(_inputs_hash().encode('ascii'))
+    digest.update(repr(_installed_dist_versions()).encode('utf-8'))
+    return f"{Path(spec_file).stem}-{digest.hexdigest()}"
+
+
+def restore_cached_workpath(spec_file, cache_key):
+    """
+    将缓存的工作目录（含 PYZ-00.pyz 及其TOC）恢复到构建目录
+    
+    Args:
+        spec_file: spec文件路径
+        cache_key: 缓存键（见 _workpath_cache_key）
+        
+    Returns:
+        bool: 是否命中缓存
+    """
+    import shutil
+    cache_dir = BUILD_CACHE_DIR / cache_key
+    if not (cache_dir / "PYZ-00.pyz").exists():
+        return False
+    
+    workpath = BUILD_DIR / Path(spec_file).stem
+    try:
+        if workpath.exists():
+            shutil.rmtree(workpath)
+        shutil.copytree(cache_dir, workpath)
+        print(f"   ♻️ 复用缓存的构建文件: {cache_dir}")
+        return True
+    except OSError as e:
+        print(f"   ⚠️ 恢复构建缓存失败: {e}")
+        return False
+
+
+def store_workpath_cache(spec_file, cache_key):
+    """
+    构建成功后将工作目录保存到缓存，并删除该spec的旧缓存
+    
+    Args:
+        spec_file: spec文件路径
+        cache_key: 缓存键（见 _workpath_cache_key）
+    """
+    import shutil
+    workpath = BUILD_DIR / Path(spec_file).stem
+    if not (workpath / "PYZ-00.pyz").exists():
+        return
+    
+    cache_dir = BUILD_CACHE_DIR / cache_key
+    prefix = f"{Path(spec_file).stem}-"
+    try:
+        if BUILD_CACHE_DIR.exists():
+            with os.scandir(BUILD_CACHE_DIR) as it:
+                for entry in it:
+                    if entry.name.startswith(prefix) and entry.is_dir(follow_symlinks=False):
+                        shutil.rmtree(entry.path, ignore_errors=True)
+        shutil.copytree(workpath, cache_dir)
+    except OSError as e:
+        print(f"   ⚠️ 保存构建缓存失败: {e}")
+
+
+# PyInstaller输出日志
+BUILD_LOG_FILE = PACKAGE_ROOT_DIR / "build.log"
+BUILD_LOG_TAIL_LINES = 40
+
+
+def _tail_build_log():
+    """读取构建日志的最后若干行（Windows中文系统输出为GBK编码）"""
+    try:
+        with open(BUILD_LOG_FILE, 'rb') as f:
+            lines = deque(f, maxlen=BUILD_LOG_TAIL_LINES)
+    except OSError:
+        return ""
+    return b"".join(lines).decode('gbk', errors='ignore')
+
+
+def run_pyinstaller(spec_files, incremental=False):
+    """
+    运行PyInstaller打包多个spec文件
+    
+    Args:
+        spec_files: spec文件或其列表
+        incremental: 增量模式，保留已有工作目录且不传 --clean
+    """
+    import subprocess
     print("🚀 开始打包...")
     
     if not isinstance(spec_files, list):
@@ -267,35 +725,55 @@ def run_pyinstaller(spec_files):
     for i, spec_file in enumerate(spec_files, 1):
         print(f"\n📦 打包 {i}/{len(spec_files)}: {spec_file.name}")
         
+        # 缓存键在构建前计算，构建成功后用同一个键保存
+        cache_key = _workpath_cache_key(spec_file)
+        
+        # 只有增量模式复用工作目录：优先使用现有目录，其次尝试恢复缓存；
+        # 默认构建始终从干净状态开始
+        if incremental and not (BUILD_DIR / spec_file.stem).exists():
+            restore_cached_workpath(spec_file, cache_key)
+        
         cmd = [
             sys.executable, "-m", "PyInstaller",
-            "--clean",              # 清理临时文件
             "--noconfirm",          # 不询问确认
             "--log-level", "INFO",  # 设置日志级别
             "--workpath", str(BUILD_DIR),  # 指定工作目录
             "--distpath", str(DIST_DIR),   # 指定输出目录
             str(spec_file)
         ]
+        if not incremental:
+            cmd.insert(3, "--clean")  # 清理临时文件
         
         print(f"   执行命令: {' '.join(cmd)}")
         
         try:
-            # 使用系统默认编码，避免UTF-8解码错误
-            result = subprocess.run(
-                cmd, 
-                cwd=CURRENT_DIR,  # 在源代码目录执行
-                capture_output=True, 
-                text=True,
-                encoding='gbk',  # Windows中文系统使用GBK编码
-                errors='ignore'  # 忽略解码错误
-            )
+            # 原始字节同时写入日志文件和控制台，成功路径上无需解码
+            PACKAGE_ROOT_DIR.mkdir(parents=True, exist_ok=True)
+            console = getattr(sys.stdout, 'buffer', None)
+            sys.stdout.flush()
+            with open(BUILD_LOG_FILE, 'wb') as log:
+                proc = subprocess.Popen(
+                    cmd,
+                    cwd=CURRENT_DIR,  # 在源代码目录执行
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.STDOUT
+                )
+                for line in proc.stdout:
+                    log.write(line)
+                    if console is not None:
+                        console.write(line)
+                        console.flush()
+                    else:
+                        sys.stdout.write(line.decode('gbk', errors='ignore'))
+                returncode = proc.wait()
             
-            if result.returncode == 0:
+            if returncode == 0:
                 print(f"   ✅ 打包成功: {spec_file.name}")
+                store_workpath_cache(spec_file, cache_key)
             else:
-                print(f"   ❌ 打包失败: {spec_file.name}")
-                print("错误输出:")
-                print(result.stderr)
+                print(f"   ❌ 打包失败: {spec_file.name} (返回码 {returncode})")
+                print(f"错误输出（最后 {BUILD_LOG_TAIL_LINES} 行，完整日志见 {BUILD_LOG_FILE}）:")
+                print(_tail_build_log())
                 return False
                 
         except subprocess.CalledProcessError as e:
@@ -310,6 +788,7 @@ def run_pyinstaller(spec_files):
 
 def post_build_setup():
     """打包后的设置"""
+    import shutil
     print("🔧 执行打包后设置...")
     
     # 检查输出目录
@@ -324,15 +803,16 @@ def post_build_setup():
         "LICENSE",
     ]
     
-    for file_name in extra_files:
-        src_file = CURRENT_DIR / file_name
-        if src_file.exists():
-            dst_file = output_dir / file_name
-            try:
-                shutil.copy2(src_file, dst_file)
-                print(f"   ✅ 复制: {file_name}")
-            except Exception as e:
-                print(f"   ⚠️ 复制失败: {file_name} - {e}")
+    # 一次列出项目目录，代替逐个文件的 exists() 检查
+    with os.scandir(CURRENT_DIR) as it:
+        present = {entry.name for entry in it if entry.is_file()}
+    
+    def copy_extra_file(file_name):
+        try:
+            shutil.copy2(CURRENT_DIR / file_name, output_dir / file_name)
+            print(f"   ✅ 复制: {file_name}")
+        except Exception as e:
+            print(f"   ⚠️ 复制失败: {file_name} - {e}")
     
     # 获取GitHub仓库URL
     try:
@@ -341,10 +821,8 @@ def post_build_setup():
     except ImportError:
         github_url = 'https://github.com/BiliBili-XiaYun/BiliBili-Live-Assistant---Zixuan-s-Special-Edition'
     
-    # 创建配置文件使用说明
-    config_readme = output_dir / "配置说明.txt"
-    with open(config_readme, 'w', encoding='utf-8') as f:
-        f.write(f"""📝 {PROJECT_NAME} v{VERSION} 配置说明
+    # 配置文件使用说明
+    readme_bytes = f"""📝 {PROJECT_NAME} v{VERSION} 配置说明
 
 🚀 首次使用步骤：
 
@@ -373,13 +851,10 @@ def post_build_setup():
 
 🔗 更多帮助：
    GitHub: {github_url}
-""")
-    print(f"   ✅ 创建配置说明: 配置说明.txt")
+""".encode('utf-8')
     
-    # 创建启动脚本（可选）
-    startup_script = output_dir / "启动.bat"
-    with open(startup_script, 'w', encoding='utf-8') as f:
-        f.write(f"""@echo off
+    # 启动脚本：不带BOM的UTF-8（BOM会破坏首行命令），显式使用CRLF换行
+    startup_bytes = f"""@echo off
 chcp 65001 >nul
 echo 正在启动 {PROJECT_NAME}...
 echo.
@@ -387,12 +862,43 @@ echo 首次使用请先阅读"配置说明.txt"
 echo.
 "{EXECUTABLE_NAME}.exe"
 pause
-""")
-    print(f"   ✅ 创建启动脚本: 启动.bat")
+""".replace('\n', '\r\n').encode('utf-8')
+    
+    def write_generated_file(item):
+        file_name, content, label = item
+        (output_dir / file_name).write_bytes(content)
+        print(f"   ✅ {label}: {file_name}")
+    
+    generated_files = [
+        ("配置说明.txt", readme_bytes, "创建配置说明"),
+        ("启动.bat", startup_bytes, "创建启动脚本"),
+    ]
+    
+    # 复制和生成文件互不依赖，放在同一个线程池中并发执行
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        copies = executor.map(copy_extra_file,
+                              [name for name in extra_files if name in present])
+        writes = executor.map(write_generated_file, generated_files)
+        list(copies)
+        list(writes)
     
     return True
 
 
+def _tree_size(dir_path):
+    """统计目录下普通文件总大小（显式栈遍历，使用 DirEntry 缓存的类型和 stat 结果）"""
+    total = 0
+    stack = [dir_path]
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    total += entry.stat(follow_symlinks=False).st_size
+    return total
+
+
 def print_summary():
     """打印打包总结"""
     output_dir = DIST_DIR / EXECUTABLE_NAME
@@ -410,9 +916,7 @@ def print_summary():
 
     # 显示目录大小
     try:
-        total_size = sum(
-            f.stat().st_size for f in output_dir.rglob('*') if f.is_file()
-        ) if output_dir.exists() else 0
+        total_size = _tree_size(str(output_dir)) if output_dir.exists() else 0
         size_mb = total_size / (1024 * 1024)
         print(f"   - 目录大小: {size_mb:.1f} MB")
     except Exception:
@@ -424,10 +928,36 @@ def print_summary():
     print("\n✨ 现在可以将此目录复制到其他电脑使用!")
 
 
-def main():
-    """主函数"""
+def parse_args():
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description=f"{PROJECT_NAME} 打包工具")
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='增量打包：保留构建目录，由PyInstaller复用上次的分析结果'
+    )
+    parser.add_argument(
+        '--no-upx',
+        action='store_true',
+        help='不使用UPX压缩：打包更快、程序启动更快，但输出目录体积更大'
+    )
+    return parser.parse_args()
+
+
+def main(incremental=False, use_upx=True):
+    """
+    主函数
+    
+    Args:
+        incremental: 是否增量打包（不清理构建目录）
+        use_upx: 是否使用UPX压缩
+    """
     print(f"🔨 {PROJECT_NAME} v{VERSION} 打包工具")
     print(f"📅 Python版本: {sys.version}")
+    if incremental:
+        print("♻️ 增量打包模式")
+    if not use_upx:
+        print("📦 已关闭UPX压缩")
     print("="*60)
     
     # 检查主脚本是否存在
@@ -442,19 +972,30 @@ def main():
     
     # 执行打包流程
     try:
-        # 1. 清理构建目录
-        clean_build_dirs()
-        
-        # 2. 检查依赖
-        if not check_dependencies():
-            return False
-        
-        # 3. 创建spec文件
-        spec_files = create_spec_files()
-        
-        # 4. 运行PyInstaller
-        if not run_pyinstaller(spec_files):
-            return False
+        # 输入未变化时跳过清理和重新打包
+        if is_build_up_to_date(_inputs_hash(), use_upx=use_upx):
+            print("♻️ 输入未变化，跳过重新打包")
+        else:
+            # 1. 清理构建目录（增量模式保留）
+            if not incremental:
+                clean_build_dirs()
+            
+            # 2. 检查依赖
+            if not check_dependencies():
+                return False
+            
+            # 预编译字节码
+            precompile_sources()
+            
+            # 3. 创建spec文件
+            spec_files = create_spec_files(use_upx=use_upx)
+            
+            # 4. 运行PyInstaller
+            if not run_pyinstaller(spec_files, incremental=incremental):
+                return False
+            
+            # spec文件已重新生成，在此之后计算摘要
+            write_build_manifest(use_upx=use_upx)
         
         # 5. 打包后设置
         if not post_build_setup():
@@ -476,8 +1017,8 @@ def main():
 
 
 if __name__ == "__main__":
-    import datetime
-    success = main()
+    args = parse_args()
+    success = main(incremental=args.incremental, use_upx=not args.no_upx)
     
     if success:
         print(f"\n🎊 打包成功完成! ({datetime.datetime.now().strftime('%H:%M:%S')})")
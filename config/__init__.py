@@ -5,21 +5,72 @@
 """
 
 import os
+import sys
+import copy
 import json
+import threading
+from types import MappingProxyType
 from typing import Dict, Any, Optional
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+def _read_json_file(file_path: str) -> Any:
+    """
+    以二进制方式读取并解析JSON文件（优先使用orjson）
+    
+    Args:
+        file_path (str): 文件路径
+        
+    Returns:
+        Any: 解析结果
+    """
+    with open(file_path, 'rb') as f:
+        data = f.read()
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+# get_name_list_file 使用的配置文件解析缓存（按修改时间失效）
+_cfg_cache: Dict[str, Any] = {"mtime": None, "data": None}
+
+
+def _load_config_file_cached(config_file: str) -> Optional[Dict[str, Any]]:
+    """
+    读取配置文件，文件未修改时复用上次解析结果
+    
+    Args:
+        config_file (str): 配置文件路径
+        
+    Returns:
+        Optional[dict]: 配置字典，文件不存在时返回None
+    """
+    try:
+        mtime = os.stat(config_file).st_mtime_ns
+    except OSError:
+        return None
+    
+    if _cfg_cache["mtime"] != mtime:
+        data = _read_json_file(config_file)
+        _cfg_cache["mtime"] = mtime
+        _cfg_cache["data"] = data
+    return _cfg_cache["data"]
+
+
 def get_name_list_file() -> str:
     """
     获取名单文件路径
     从配置文件中读取name_list_file字段
     如果未设置，则返回默认路径
     """
-    config_file = "config.json"
-    if not os.path.exists(config_file):
+    config = _load_config_file_cached("config.json")
+    if config is None:
         # 如果配置文件不存在，返回默认路径
         return os.path.join(os.getcwd(), "name_list.json")
-    with open(config_file, 'r', encoding='utf-8') as f:
-        config = json.load(f)
     name_list_file = config.get("queue.name_list_file", "")
     if not name_list_file:
         # 如果未设置，使用默认路径
@@ -108,16 +159,24 @@ class Config:
             config_file (str): 配置文件路径
         """
         self.config_file = config_file
-        self._config = self.DEFAULT_CONFIG.copy()
+        self._config = copy.deepcopy(_DEFAULTS_FROZEN)
+        # 点分路径 -> 配置值 的扁平索引，get() 直接查表
+        self._flat: Dict[str, Any] = {}
+        # 后台监视线程只检测文件变化并递增版本号，
+        # 实际的重新加载由界面线程调用 reload_if_changed() 完成
+        self._version = 0
+        self._loaded_version = 0
+        self._last_mtime = 0.0
+        self._watcher_thread: Optional[threading.Thread] = None
+        self._watcher_stop = threading.Event()
         self.load_config()
     
     def load_config(self) -> None:
         """加载配置文件"""
         try:
             if os.path.exists(self.config_file):
-                with open(self.config_file, 'r', encoding='utf-8') as f:
-                    saved_config = json.load(f)
-                    self._merge_config(self._config, saved_config)
+                saved_config = _read_json_file(self.config_file)
+                self._merge_config(self._config, saved_config)
                 from utils import get_main_logger
 
                 logger = get_main_logger()
@@ -135,6 +194,8 @@ class Config:
                 self.save_config()  # 创建默认配置文件
         except Exception as e:
             print(f"加载配置文件失败: {str(e)}，使用默认配置")
+        finally:
+            self._reflatten()
     
     def get_file_modification_time(self) -> float:
         """获取配置文件修改时间"""
@@ -150,35 +211,82 @@ class Config:
         current_mtime = self.get_file_modification_time()
         return current_mtime > last_mtime
     
-    def reload_if_modified(self, last_mtime: float) -> float:
-        """如果配置文件被修改则重新加载，返回新的修改时间"""
-        if self.is_config_file_modified(last_mtime):
-            from utils import get_main_logger
-
-            logger = get_main_logger()
-            logger.info("检测到配置文件被修改，重新加载配置")
-            self.reload_config_from_file()
-            return self.get_file_modification_time()
-        return last_mtime
+    @property
+    def version(self) -> int:
+        """配置文件版本号，监视线程每次检测到文件修改后递增"""
+        return self._version
+    
+    def reload_if_changed(self) -> bool:
+        """
+        监视线程检测到文件修改且尚未重新加载时，重新加载配置
+        
+        必须在界面线程中调用，与 get()/set()/save_config() 不会并发
+        
+        Returns:
+            bool: 是否重新加载了配置
+        """
+        if self._version == self._loaded_version:
+            return False
+        self.reload_config_from_file()
+        return True
+    
+    def start_watcher(self, interval: float = 1.0) -> None:
+        """
+        启动配置文件监视线程（重复调用无副作用）
+        
+        整个进程只由该线程检查文件修改时间，调用方只需比较 version
+        
+        Args:
+            interval (float): 检查间隔（秒）
+        """
+        if self._watcher_thread is not None and self._watcher_thread.is_alive():
+            return
+        self._last_mtime = self.get_file_modification_time()
+        self._watcher_stop.clear()
+        self._watcher_thread = threading.Thread(
+            target=self._watch_loop,
+            args=(interval,),
+            name="ConfigWatcher",
+            daemon=True
+        )
+        self._watcher_thread.start()
+    
+    def stop_watcher(self) -> None:
+        """停止配置文件监视线程"""
+        self._watcher_stop.set()
+    
+    def _watch_loop(self, interval: float) -> None:
+        """监视线程主循环"""
+        while not self._watcher_stop.wait(interval):
+            new_mtime = self.get_file_modification_time()
+            if new_mtime > self._last_mtime:
+                self._last_mtime = new_mtime
+                self._version += 1
     
     def save_config(self) -> None:
         """保存配置文件"""
         try:
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(self._config, f, ensure_ascii=False, indent=2)
+            if ORJSON_AVAILABLE:
+                data = orjson.dumps(self._config, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+            else:
+                data = json.dumps(self._config, ensure_ascii=False, indent=2).encode('utf-8')
+            with open(self.config_file, 'wb') as f:
+                f.write(data)
             print(f"配置已保存到 {self.config_file}")
         except Exception as e:
             print(f"保存配置文件失败: {str(e)}")
     
     def reload_config_from_file(self) -> None:
-        """重新从文件加载配置，用于同步外部配置变更"""
+        """重新从文件加载配置，用于同步外部配置变更（只能在界面线程中调用）"""
+        # 先记录版本号：读取期间文件再次变化会让版本号继续递增，下次检查时再加载
+        self._loaded_version = self._version
         try:
             if os.path.exists(self.config_file):
-                with open(self.config_file, 'r', encoding='utf-8') as f:
-                    saved_config = json.load(f)
-                    # 重置为默认配置后再合并
-                    self._config = self.DEFAULT_CONFIG.copy()
-                    self._merge_config(self._config, saved_config)
+                saved_config = _read_json_file(self.config_file)
+                # 重置为默认配置后再合并
+                self._config = copy.deepcopy(_DEFAULTS_FROZEN)
+                self._merge_config(self._config, saved_config)
+                self._reflatten()
                 from utils import get_main_logger
 
                 logger = get_main_logger()
@@ -198,17 +306,33 @@ class Config:
     
     def _merge_config(self, base: Dict[str, Any], update: Dict[str, Any]) -> None:
         """
-        递归合并配置字典
+        合并配置字典（嵌套字典逐层合并，使用显式栈代替递归）
         
         Args:
             base (dict): 基础配置
             update (dict): 更新配置
         """
-        for key, value in update.items():
-            if key in base and isinstance(base[key], dict) and isinstance(value, dict):
-                self._merge_config(base[key], value)
-            else:
-                base[key] = value
+        stack = [(base, update)]
+        while stack:
+            base_node, update_node = stack.pop()
+            for key, value in update_node.items():
+                if isinstance(value, dict) and isinstance(base_node.get(key), dict):
+                    stack.append((base_node[key], value))
+                else:
+                    base_node[key] = value
+    
+    def _reflatten(self) -> None:
+        """根据嵌套配置重建扁平索引（包含中间层字典本身）"""
+        flat = {}
+        stack = [("", self._config)]
+        while stack:
+            prefix, node = stack.pop()
+            for key, value in node.items():
+                path = f"{prefix}{key}"
+                flat[path] = value
+                if isinstance(value, dict):
+                    stack.append((f"{path}.", value))
+        self._flat = flat
     
     def get(self, key_path: str, default: Any = None) -> Any:
         """
@@ -221,15 +345,7 @@ class Config:
         Returns:
             Any: 配置值
         """
-        keys = key_path.split('.')
-        value = self._config
-        
-        try:
-            for key in keys:
-                value = value[key]
-            return value
-        except (KeyError, TypeError):
-            return default
+        return self._flat.get(key_path, default)
     
     def set(self, key_path: str, value: Any) -> None:
         """
@@ -241,15 +357,24 @@ class Config:
         """
         keys = key_path.split('.')
         config = self._config
+        structural = isinstance(value, dict)
         
         # 创建嵌套字典路径
         for key in keys[:-1]:
             if key not in config:
                 config[key] = {}
+                structural = True
             config = config[key]
         
         # 设置最终值
+        structural = structural or isinstance(config.get(keys[-1]), dict)
         config[keys[-1]] = value
+        
+        # 只有子树结构变化时才整体重建索引，普通叶子值直接更新
+        if structural:
+            self._reflatten()
+        else:
+            self._flat[key_path] = value
     
     def get_window_config(self, window_name: str) -> Dict[str, Any]:
         """
@@ -275,6 +400,9 @@ class Config:
             self.set(f"window.{window_name}.{key}", value)
 
 
+# 默认配置的只读快照，每次加载都从它深拷贝，避免合并时修改类属性中的子字典
+_DEFAULTS_FROZEN = copy.deepcopy(Config.DEFAULT_CONFIG)
+
 # 全局配置实例
 app_config = Config()
 
@@ -310,18 +438,21 @@ class Constants:
     ICON_512 = "resource/icon/app_icon_512.ico"
     ICON_ICO = "resource/icon/app_icon.ico"  # 通用ICO格式图标
     
+    # 图标路径缓存（仅缓存已找到的路径，未找到时下次调用会重新查找）
+    _icon_path_cache: Dict[Any, str] = {}
+    
     # 网络相关
     BILIBILI_LOGIN_QR_URL = "https://passport.bilibili.com/x/passport-login/web/qrcode/generate"
     BILIBILI_LOGIN_POLL_URL = "https://passport.bilibili.com/x/passport-login/web/qrcode/poll"
     BILIBILI_NAV_URL = "https://api.bilibili.com/x/web-interface/nav"
     
-    # HTTP头信息
-    DEFAULT_HEADERS = {
+    # HTTP头信息（只读，防止被意外修改）
+    DEFAULT_HEADERS = MappingProxyType({
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36',
         'Referer': 'https://www.bilibili.com/',
         'Origin': 'https://www.bilibili.com',
         'Accept': 'application/json, text/plain, */*',
-    }
+    })
     
     # 消息类型
     MESSAGE_TYPE_DANMAKU = 'danmaku'
@@ -363,10 +494,23 @@ class Constants:
     # 文件编码
     FILE_ENCODING = 'utf-8'
     
+    # 调试模式（开启后bilibili-api会输出每个数据帧，仅供开发调试）
+    DEBUG_MODE = False
+    
     # 超时设置（秒）
     HTTP_TIMEOUT = 10
     LOGIN_POLL_INTERVAL = 2
+    LOGIN_POLL_INITIAL_DELAY = 3.0   # 二维码轮询初始间隔
+    LOGIN_POLL_SCANNED_DELAY = 0.5   # 已扫码待确认时的轮询间隔
+    LOGIN_POLL_MAX_DELAY = 5.0       # 未扫码时的最大轮询间隔
+    LOGIN_POLL_BACKOFF = 1.2         # 未扫码时的间隔增长倍数
     MONITOR_STOP_TIMEOUT = 5
+    DANMAKU_MAX_RECONNECT_ATTEMPTS = 8     # 弹幕连接最大重连次数
+    DANMAKU_RECONNECT_MAX_DELAY = 60       # 弹幕重连退避的最大间隔（秒）
+    DANMAKU_TRANSPORT_MAX_RETRY = 5        # bilibili-api内部的传输层重试次数
+    DANMAKU_TRANSPORT_RETRY_AFTER = 1      # bilibili-api内部的重试间隔（秒）
+    MESSAGE_BATCH_INTERVAL = 0.05  # 消息批量发送的最长等待时间
+    MESSAGE_BATCH_SIZE = 64        # 每批最多合并的消息数
       # UI相关
     QR_CODE_SIZE = (280, 280)
     LOGIN_DIALOG_SIZE = (350, 500)
@@ -391,18 +535,21 @@ class Constants:
         """
         获取程序图标路径（所有图标均为ICO格式）
         
+        找到的路径按尺寸缓存；打包运行时优先从 sys._MEIPASS 查找
+        
         Args:
             size: 图标尺寸，支持64, 128, 256, 512，或'default'使用通用图标
             
         Returns:
             str: 图标文件的绝对路径，如果文件不存在则返回None
         """
-        # 如果请求默认图标或者没有指定尺寸
-        if size == 'default' or size not in [64, 128, 256, 512]:
-            icon_path = os.path.join(os.getcwd(), Constants.ICON_ICO)
-            if os.path.exists(icon_path):
-                return icon_path
-                
+        cached_path = Constants._icon_path_cache.get(size)
+        if cached_path is not None:
+            return cached_path
+        
+        # 调用时确定基准目录（main.py 启动时会切换工作目录，不能在导入时固定）
+        base_dir = getattr(sys, '_MEIPASS', None) or os.getcwd()
+        
         # 根据尺寸选择对应的ICO文件
         icon_mapping = {
             64: Constants.ICON_64,
@@ -412,13 +559,15 @@ class Constants:
         }
         
         if size in icon_mapping:
-            icon_path = os.path.join(os.getcwd(), icon_mapping[size])
-            if os.path.exists(icon_path):
+            icon_path = os.path.join(base_dir, icon_mapping[size])
+            if os.path.isfile(icon_path):
+                Constants._icon_path_cache[size] = icon_path
                 return icon_path
         
-        # 如果指定尺寸的图标不存在，回退到通用图标
-        fallback_path = os.path.join(os.getcwd(), Constants.ICON_ICO)
-        if os.path.exists(fallback_path):
+        # 请求默认图标、尺寸不支持或指定尺寸的图标不存在时，使用通用图标
+        fallback_path = os.path.join(base_dir, Constants.ICON_ICO)
+        if os.path.isfile(fallback_path):
+            Constants._icon_path_cache[size] = fallback_path
             return fallback_path
             
         return None
@@ -4,22 +4,27 @@
 插队对话框模块 - 处理插队选择界面，支持模糊检索
 """
 
-from typing import List, Optional
+from typing import Callable, List, Optional
 import re
 
 from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QPushButton, 
-                             QLabel, QLineEdit, QListWidget, QListWidgetItem,
+                             QLabel, QLineEdit, QListView,
                              QCheckBox, QGroupBox, QMessageBox)
-from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QFont
+from PyQt6.QtCore import Qt, QModelIndex, QTimer
+from PyQt6.QtGui import QFont, QIcon
 
 from models import QueueItem
 from config import Constants
+from .queue_item_model import QueueItemListModel, QueueItemFilterProxy
 
 
 class InsertQueueDialog(QDialog):
     """插队选择对话框"""
     
+    # 所有实例共用的标题字体和窗口图标，首次打开对话框时创建
+    _TITLE_FONT: Optional[QFont] = None
+    _ICON: Optional[QIcon] = None
+    
     def __init__(self, name_list: List[QueueItem], parent=None):
         """
         初始化插队对话框
@@ -34,27 +39,48 @@ class InsertQueueDialog(QDialog):
         self.setModal(True)
         
         # 设置窗口图标
-        icon_path = Constants.get_icon_path(128)
-        if icon_path:
-            from PyQt6.QtGui import QIcon
-            self.setWindowIcon(QIcon(icon_path))
+        if InsertQueueDialog._ICON is None:
+            icon_path = Constants.get_icon_path(128)
+            if icon_path:
+                InsertQueueDialog._ICON = QIcon(icon_path)
+        if InsertQueueDialog._ICON is not None:
+            self.setWindowIcon(InsertQueueDialog._ICON)
         
         self.name_list = name_list
+        self._build_name_cache()
         self.selected_item = None
         self.fuzzy_search_enabled = True
         
         self.init_ui()
     
+    def _build_name_cache(self):
+        """预先计算小写名字和可插队（至少2次数）的项目下标，避免每次输入都重复计算"""
+        # 列表模型中的行与这两个列表一一对应（按名字排序）
+        self._eligible_items = sorted(
+            (item for item in self.name_list if item.count >= 2),
+            key=lambda x: x.name
+        )
+        self._lower_names = [item.name.lower() for item in self._eligible_items]
+        self._total_available = len(self._eligible_items)
+        self._reset_search_cache()
+    
+    def _reset_search_cache(self):
+        """清空上一次的搜索结果（名单或搜索模式改变时调用）"""
+        self._last_query = ""
+        self._last_rows: List[int] = []
+    
     def init_ui(self):
         """初始化用户界面"""
         layout = QVBoxLayout()
         
         # 标题说明
         title_label = QLabel("插队功能")
-        title_font = QFont()
-        title_font.setBold(True)
-        title_font.setPointSize(12)
-        title_label.setFont(title_font)
+        if InsertQueueDialog._TITLE_FONT is None:
+            title_font = QFont()
+            title_font.setBold(True)
+            title_font.setPointSize(12)
+            InsertQueueDialog._TITLE_FONT = title_font
+        title_label.setFont(InsertQueueDialog._TITLE_FONT)
         layout.addWidget(title_label)
         
         description_label = QLabel("选择要插队的用户，插队将消耗2次数，会插入到队列最前面")
@@ -77,14 +103,27 @@ class InsertQueueDialog(QDialog):
         # 搜索框
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("输入名字或部分文字进行搜索...")
-        self.search_input.textChanged.connect(self.filter_names)
+        self.search_input.textChanged.connect(self.on_search_text_changed)
+        self.search_input.returnPressed.connect(self._do_filter)
+        
+        # 输入防抖：连续输入时只在停顿后过滤一次
+        self._filter_timer = QTimer(self)
+        self._filter_timer.setSingleShot(True)
+        self._filter_timer.setInterval(100)
+        self._filter_timer.timeout.connect(self._do_filter)
         layout.addWidget(QLabel("搜索名字:"))
         layout.addWidget(self.search_input)
         
         # 匹配结果列表
-        self.result_list = QListWidget()
-        self.result_list.itemClicked.connect(self.on_item_clicked)
-        self.result_list.itemDoubleClicked.connect(self.on_item_selected)
+        self.result_model = QueueItemListModel(self._eligible_items, self)
+        self.result_proxy = QueueItemFilterProxy(self)
+        self.result_proxy.setSourceModel(self.result_model)
+        self.result_list = QListView()
+        self.result_list.setModel(self.result_proxy)
+        self.result_list.setUniformItemSizes(True)
+        self.result_list.setLayoutMode(QListView.LayoutMode.Batched)
+        self.result_list.clicked.connect(self.on_item_clicked)
+        self.result_list.doubleClicked.connect(self.on_item_selected)
         layout.addWidget(QLabel("匹配结果:"))
         layout.addWidget(self.result_list)
         
@@ -107,12 +146,13 @@ class InsertQueueDialog(QDialog):
         layout.addLayout(button_layout)
         self.setLayout(layout)
         
-        # 初始化显示所有名字
-        self.filter_names("")
+        # 模型初始就显示所有名字，只需更新统计信息，不必再过滤一遍
+        self.update_result_status()
         
     def on_search_mode_changed(self, enabled: bool):
         """搜索模式改变处理"""
         self.fuzzy_search_enabled = enabled
+        self._reset_search_cache()
         current_text = self.search_input.text()
         if current_text:
             self.filter_names(current_text)
@@ -123,39 +163,39 @@ class InsertQueueDialog(QDialog):
         else:
             self.search_input.setPlaceholderText("输入完整名字进行精确搜索...")
     
-    def fuzzy_match(self, search_text: str, target_name: str) -> bool:
+    @staticmethod
+    def compile_fuzzy_matcher(search_lower: str) -> Callable[[str], Optional[re.Match]]:
         """
-        模糊匹配算法
+        编译模糊匹配用的正则（字符顺序匹配，不要求连续，直接包含也属于此类）
+        
+        每次搜索只编译一次，逐项匹配在正则引擎中完成
         
         Args:
-            search_text: 搜索文本
-            target_name: 目标名字
+            search_lower: 已去除首尾空白并转为小写的搜索文本
             
         Returns:
-            bool: 是否匹配
+            Callable: 对小写名字调用，匹配时返回真值
         """
-        search_lower = search_text.lower().strip()
-        target_lower = target_name.lower()
-        
-        # 1. 直接包含匹配
-        if search_lower in target_lower:
-            return True
-        
-        # 2. 字符顺序匹配（不要求连续）
-        search_index = 0
-        for char in target_lower:
-            if search_index < len(search_lower) and char == search_lower[search_index]:
-                search_index += 1
-                if search_index == len(search_lower):
-                    return True
-        
-        # 3. 正则模糊匹配（容错）
-        try:
-            # 将搜索文本转换为模糊匹配的正则表达式
-            pattern = '.*'.join(re.escape(char) for char in search_lower)
-            return bool(re.search(pattern, target_lower))
-        except:
-            return False    
+        return re.compile('.*?'.join(map(re.escape, search_lower))).search
+    
+    def on_search_text_changed(self, text: str):
+        """
+        搜索文本改变处理，清空时立即过滤，否则重新开始防抖计时
+        
+        Args:
+            text (str): 当前搜索文本
+        """
+        if not text:
+            self._filter_timer.stop()
+            self.filter_names(text)
+        else:
+            self._filter_timer.start()
+    
+    def _do_filter(self):
+        """按搜索框当前内容执行过滤（防抖计时结束或按下回车时调用）"""
+        self._filter_timer.stop()
+        self.filter_names(self.search_input.text())
+    
     def filter_names(self, text: str):
         """
         过滤名字列表
@@ -163,58 +203,64 @@ class InsertQueueDialog(QDialog):
         Args:
             text (str): 搜索文本
         """
-        self.result_list.clear()
         search_text = text.strip()
+        row_predicate = None  # 空搜索显示所有
         
-        matched_items = []
-        
-        for item in self.name_list:
-            # 只显示有足够次数的项目（插队需要2次数）
-            if item.count < 2:
-                continue
-                
-            is_match = False
+        if search_text:
+            search_lower = search_text.lower()
+            lower_names = self._lower_names
+            
+            # 在上一次搜索文本后继续输入时，新结果一定是上一次结果的子集
+            if self._last_query and search_lower.startswith(self._last_query):
+                candidates = self._last_rows
+            else:
+                candidates = range(len(lower_names))
             
-            if not search_text:  # 空搜索显示所有
-                is_match = True
-            elif self.fuzzy_search_enabled:
-                is_match = self.fuzzy_match(search_text, item.name)
+            if self.fuzzy_search_enabled:
+                fuzzy_match = self.compile_fuzzy_matcher(search_lower)
+                rows = [i for i in candidates if fuzzy_match(lower_names[i])]
             else:  # 精确搜索
-                is_match = search_text.lower() in item.name.lower()
+                rows = [i for i in candidates if search_lower in lower_names[i]]
             
-            if is_match:
-                matched_items.append(item)
+            self._last_query, self._last_rows = search_lower, rows
+            row_predicate = set(rows).__contains__
+        else:
+            self._reset_search_cache()
         
-        # 按名字排序
-        matched_items.sort(key=lambda x: x.name)
+        # 重新过滤期间暂停视图刷新，结束后只重绘一次
+        self.result_list.setUpdatesEnabled(False)
+        try:
+            self.result_proxy.set_search(search_text, row_predicate)
+        finally:
+            self.result_list.setUpdatesEnabled(True)
         
-        # 添加到列表
-        for item in matched_items:
-            display_text = f"{item.name} (序号:{item.index}, 次数:{item.count})"
-            list_item = QListWidgetItem(display_text)
-            list_item.setData(Qt.ItemDataRole.UserRole, item)
-            self.result_list.addItem(list_item)
+        self.update_result_status(search_text)
+    
+    def update_result_status(self, search_text: str = ""):
+        """
+        根据当前显示的结果数量更新状态文字
+        
+        Args:
+            search_text (str): 当前搜索文本（已去除首尾空白）
+        """
+        matched_count = self.result_proxy.rowCount()
         
         # 如果没有搜索结果，显示提示
-        if self.result_list.count() == 0 and search_text:
-            hint_text = "没有找到匹配的名字或次数不足" if not self.fuzzy_search_enabled else "没有找到匹配的名字或次数不足（已启用模糊搜索）"
-            hint_item = QListWidgetItem(hint_text)
-            hint_item.setFlags(Qt.ItemFlag.NoItemFlags)  # 禁用选择
-            self.result_list.addItem(hint_item)
-        
-        # 更新统计信息
-        total_available = len([item for item in self.name_list if item.count >= 2])
-        status_text = f"显示 {len(matched_items)} / {total_available} 个可插队项目"
+        if matched_count == 0 and search_text:
+            status_text = "没有找到匹配的名字或次数不足" if not self.fuzzy_search_enabled else "没有找到匹配的名字或次数不足（已启用模糊搜索）"
+        else:
+            # 更新统计信息
+            status_text = f"显示 {matched_count} / {self._total_available} 个可插队项目"
         self.selected_info_label.setText(status_text)
     
-    def on_item_clicked(self, item: QListWidgetItem):
+    def on_item_clicked(self, index: QModelIndex):
         """
         点击项目处理
         
         Args:
-            item (QListWidgetItem): 点击的列表项
+            index (QModelIndex): 点击的列表项
         """
-        queue_item = item.data(Qt.ItemDataRole.UserRole)
+        queue_item = index.data(Qt.ItemDataRole.UserRole)
         if queue_item is not None:  # 确保不是提示项
             self.selected_item = queue_item
             self.ok_btn.setEnabled(True)
@@ -226,14 +272,14 @@ class InsertQueueDialog(QDialog):
             self.selected_item = None
             self.ok_btn.setEnabled(False)
     
-    def on_item_selected(self, item: QListWidgetItem):
+    def on_item_selected(self, index: QModelIndex):
         """
         双击选择项目处理
         
         Args:
-            item (QListWidgetItem): 选中的列表项
+            index (QModelIndex): 选中的列表项
         """
-        queue_item = item.data(Qt.ItemDataRole.UserRole)
+        queue_item = index.data(Qt.ItemDataRole.UserRole)
         if queue_item is not None:  # 确保不是提示项
             self.selected_item = queue_item
             self.ok_btn.setEnabled(True)
@@ -264,9 +310,9 @@ class InsertQueueDialog(QDialog):
         """处理键盘事件"""
         # 支持回车键确认选择
         if event.key() == Qt.Key.Key_Return or event.key() == Qt.Key.Key_Enter:
-            current_item = self.result_list.currentItem()
-            if current_item and current_item.data(Qt.ItemDataRole.UserRole) is not None:
-                self.on_item_selected(current_item)
+            current_index = self.result_list.currentIndex()
+            if current_index.isValid() and current_index.data(Qt.ItemDataRole.UserRole) is not None:
+                self.on_item_selected(current_index)
                 return
         
         # 支持ESC键取消
@@ -3,10 +3,10 @@
 """应用启动时的加载界面。"""
 from __future__ import annotations
 
-from datetime import datetime
+import time
 
-from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QColor, QFont, QPalette, QTextCursor
+from PyQt6.QtCore import Qt, QTime
+from PyQt6.QtGui import QColor, QFont, QPalette
 from PyQt6.QtWidgets import (
     QApplication,
     QLabel,
@@ -17,6 +17,12 @@ from PyQt6.QtWidgets import (
 )
 
 
+# 启动阶段主线程被初始化工作占用，处理事件循环的最小间隔（秒）
+PROCESS_EVENTS_INTERVAL = 0.05
+# 日志区域最多保留的行数
+MAX_LOG_LINES = 500
+
+
 class LoadingSplashScreen(QWidget):
     """带日志输出的启动加载界面。"""
 
@@ -54,12 +60,16 @@ class LoadingSplashScreen(QWidget):
         self.log_view.setReadOnly(True)
         self.log_view.setMinimumHeight(160)
         self.log_view.setObjectName("splashLogView")
+        # 只保留最近的日志行，追加的开销不随日志增多而增长
+        self.log_view.document().setMaximumBlockCount(MAX_LOG_LINES)
 
         container_layout.addWidget(self.title_label)
         container_layout.addWidget(self.progress_bar)
         container_layout.addWidget(self.log_view)
         outer_layout.addWidget(container)
 
+        self._last_process_events = 0.0
+
         self._apply_styles()
         self.resize(520, 320)
         self._center_on_screen()
@@ -109,14 +119,23 @@ class LoadingSplashScreen(QWidget):
     def append_message(self, message: str) -> None:
         if not message:
             return
-        timestamp = datetime.now().strftime("%H:%M:%S")
+        timestamp = QTime.currentTime().toString("HH:mm:ss")
         self.log_view.append(f"[{timestamp}] {message}")
-        self.log_view.moveCursor(QTextCursor.MoveOperation.End)
-        QApplication.processEvents()
+        # 只重绘日志区域；完整的事件循环按时间间隔节流处理
+        self.log_view.repaint()
+        self._process_events_throttled()
 
     def set_title(self, title: str) -> None:
         if title:
             self.title_label.setText(title)
+            self.title_label.repaint()
+            self._process_events_throttled()
+
+    def _process_events_throttled(self) -> None:
+        """距上次处理事件超过间隔时才调用 processEvents，保持窗口响应。"""
+        now = time.monotonic()
+        if now - self._last_process_events >= PROCESS_EVENTS_INTERVAL:
+            self._last_process_events = now
             QApplication.processEvents()
 
     def finish(self, target: QWidget | None = None) -> None:
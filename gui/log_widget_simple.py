@@ -6,22 +6,94 @@
 
 import os
 import time
+import weakref
+from collections import deque
+from itertools import islice
 from datetime import datetime
-from typing import List, Optional
-from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QTextEdit, 
+from typing import List, Optional, Tuple
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPlainTextEdit, 
                              QPushButton, QLabel, QComboBox, QFrame)
-from PyQt6.QtCore import Qt, QTimer, pyqtSignal
-from PyQt6.QtGui import QFont, QTextCursor
+from PyQt6.QtCore import Qt, QTimer, QThread, pyqtSignal
+from PyQt6.QtGui import QFont
 
 from config import Constants
 from utils import QueueLogger, gui_logger, gui_logger
 
 
+# 日志类别及其显示名称
+CAT_SUCCESS, CAT_FAILED, CAT_COMPLETE, CAT_SYSTEM, CAT_GUARD = range(5)
+LOG_CATEGORY_NAMES = ("排队成功", "排队失败", "完成排队", "系统事件", "舰长礼物")
+
+# 筛选项对应的日志类别（"全部"不在其中，表示不过滤）
+LOG_FILTER_CATEGORIES = {
+    "成功": CAT_SUCCESS,
+    "失败": CAT_FAILED,
+    "完成": CAT_COMPLETE,
+    "系统": CAT_SYSTEM
+}
+
+
+def format_log_entry(entry: Tuple[str, int, Optional[str], str]) -> str:
+    """
+    把日志条目格式化为显示文本
+    
+    Args:
+        entry: (时间戳, 类别, 用户名, 详细信息)，系统事件的用户名为None
+        
+    Returns:
+        str: 形如 "[HH:MM:SS] 类别 - 用户名 - 详细信息" 的文本
+    """
+    timestamp, category, username, detail = entry
+    if username is None:
+        return f"[{timestamp}] {LOG_CATEGORY_NAMES[category]} - {detail}"
+    return f"[{timestamp}] {LOG_CATEGORY_NAMES[category]} - {username} - {detail}"
+
+
+class SaveLogThread(QThread):
+    """日志导出线程 - 在后台分块格式化并写入文件，避免阻塞界面"""
+    
+    # 信号定义
+    saved = pyqtSignal(str)   # 导出成功信号（文件路径）
+    failed = pyqtSignal(str)  # 导出失败信号（错误信息）
+    
+    CHUNK_LINES = 4096  # 每次格式化并写入的行数
+    
+    def __init__(self, entries: List[Tuple[str, int, Optional[str], str]], filepath: str, parent=None):
+        """
+        初始化导出线程
+        
+        Args:
+            entries: 要导出的日志条目
+            filepath: 导出文件路径
+            parent: 父对象
+        """
+        super().__init__(parent)
+        self.entries = entries
+        self.filepath = filepath
+    
+    def run(self):
+        """分块写入日志，峰值内存只与块大小有关"""
+        try:
+            it = iter(self.entries)
+            with open(self.filepath, 'w', encoding='utf-8') as f:
+                separator = ''
+                while True:
+                    chunk = list(islice(it, self.CHUNK_LINES))
+                    if not chunk:
+                        break
+                    f.write(separator + '\n'.join(map(format_log_entry, chunk)))
+                    separator = '\n'
+            self.saved.emit(self.filepath)
+        except Exception as e:
+            self.failed.emit(str(e))
+
+
 class LogDisplayWidget(QWidget):
     """日志显示组件 - 简洁版"""
     
-    # 信号定义
-    log_updated = pyqtSignal(str)
+    # 所有实例共用一个统计刷新定时器
+    _stats_timer: Optional[QTimer] = None
+    _instances = weakref.WeakSet()
     
     def __init__(self, parent=None):
         """
@@ -35,9 +107,21 @@ class LogDisplayWidget(QWidget):
         # 日志记录器
         self.logger = QueueLogger()
         
-        # 日志缓存
-        self.log_cache: List[str] = []
+        # 日志缓存（环形缓冲，超出上限时自动丢弃最旧的记录）
+        # 每条为 (时间戳, 类别, 用户名, 详细信息)，显示时才格式化为文本
         self.max_cache_size = 100000  # 设置10万条弹幕缓存上限
+        self.log_cache: deque = deque(maxlen=self.max_cache_size)
+        
+        # 等待写入显示区域的日志，定时合并成一次追加
+        self._pending: deque = deque()
+        self.flush_interval = 50  # 毫秒
+        
+        # 日志导出线程
+        self._save_thread: Optional[SaveLogThread] = None
+        
+        # 时间戳缓存：同一秒内的日志复用同一个字符串
+        self._ts_cache_sec = -1
+        self._ts_cache_str = ''
         
         # 自动滚动相关
         self.auto_scroll_enabled = True  # 自动滚动状态
@@ -54,13 +138,28 @@ class LogDisplayWidget(QWidget):
         # 初始化UI
         self.init_ui()
         
-        # 定时更新
-        self.update_timer = QTimer()
-        self.update_timer.timeout.connect(self.update_stats_display)
-        self.update_timer.start(5000)  # 每5秒更新一次
-        
-        # 连接信号
-        self.log_updated.connect(self.append_log_text)
+        # 合并写入定时器，收到日志后启动，到时一次性写入显示区域
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(self.flush_interval)
+        self._flush_timer.timeout.connect(self._flush_pending)
+        
+        # 定时更新（每5秒，所有实例共用一个定时器）
+        LogDisplayWidget._instances.add(self)
+        if LogDisplayWidget._stats_timer is None:
+            LogDisplayWidget._stats_timer = QTimer()
+            LogDisplayWidget._stats_timer.timeout.connect(LogDisplayWidget._update_all_stats)
+            LogDisplayWidget._stats_timer.start(5000)
+    
+    @classmethod
+    def _update_all_stats(cls):
+        """共用定时器回调，刷新所有实例的统计显示"""
+        for widget in list(cls._instances):
+            try:
+                widget.update_stats_display()
+            except RuntimeError:
+                # 底层Qt对象已销毁
+                cls._instances.discard(widget)
     
     def init_ui(self):
         """初始化用户界面"""
@@ -99,8 +198,10 @@ class LogDisplayWidget(QWidget):
         layout.addWidget(control_panel)
         
         # 日志显示区域
-        self.log_text = QTextEdit()
+        self.log_text = QPlainTextEdit()
         self.log_text.setReadOnly(True)
+        # 超出上限时由Qt自动丢弃最旧的行
+        self.log_text.setMaximumBlockCount(self.max_cache_size)
         # 设置等宽字体
         font = QFont("Consolas", 9)
         if not font.exactMatch():
@@ -142,9 +243,7 @@ class LogDisplayWidget(QWidget):
         if self.auto_scroll_enabled:
             self.auto_scroll_btn.setText("自动滚动: 开")
             # 立即滚动到底部
-            cursor = self.log_text.textCursor()
-            cursor.movePosition(QTextCursor.MoveOperation.End)
-            self.log_text.setTextCursor(cursor)
+            self._scroll_to_end()
             gui_logger.debug("用户手动开启自动滚动")
         else:
             self.auto_scroll_btn.setText("自动滚动: 关")
@@ -162,6 +261,7 @@ class LogDisplayWidget(QWidget):
     
     def clear_logs(self):
         """清空日志显示"""
+        self._pending.clear()
         self.log_text.clear()
         self.log_cache.clear()
         
@@ -172,123 +272,146 @@ class LogDisplayWidget(QWidget):
         self.update_stats_display()
     
     def save_logs(self):
-        """保存当前显示的日志"""
-        try:
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            filename = f"排队日志_导出_{timestamp}.txt"
-            filepath = os.path.join(os.path.dirname(Constants.DEDUCTION_LOG_FILE), filename)
-            
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(self.log_text.toPlainText())
-            
-            self.log_system_event(f"日志已导出到: {filepath}")
-        except Exception as e:
-            self.log_system_event(f"导出日志失败: {e}")
+        """保存当前显示的日志（在后台线程写入文件）"""
+        if self._save_thread is not None and self._save_thread.isRunning():
+            return
+        
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        filename = f"排队日志_导出_{timestamp}.txt"
+        filepath = os.path.join(os.path.dirname(Constants.DEDUCTION_LOG_FILE), filename)
+        
+        # 在界面线程取当前筛选结果的快照（只复制引用），格式化和写入交给后台线程
+        entries = list(self._visible_entries(self.log_cache))
+        
+        self._save_thread = SaveLogThread(entries, filepath, self)
+        self._save_thread.saved.connect(lambda path: self.log_system_event(f"日志已导出到: {path}"))
+        self._save_thread.failed.connect(lambda error: self.log_system_event(f"导出日志失败: {error}"))
+        self._save_thread.finished.connect(self._on_save_finished)
+        self.save_btn.setEnabled(False)
+        self._save_thread.start()
+    
+    def _on_save_finished(self):
+        """导出线程结束处理"""
+        self.save_btn.setEnabled(True)
+        if self._save_thread is not None:
+            self._save_thread.deleteLater()
+            self._save_thread = None
+    
+    def _visible_entries(self, entries):
+        """按当前筛选项过滤日志条目"""
+        category = LOG_FILTER_CATEGORIES.get(self.level_filter.currentText())
+        if category is None:
+            return entries
+        return (entry for entry in entries if entry[1] == category)
     
     def refresh_logs(self):
         """刷新日志显示"""
         try:
-            # 获取最近的日志
-            recent_logs = self.logger.get_recent_logs(self.max_cache_size)
+            # 从内存缓存中筛选，一次性写入显示区域
+            entries = self._visible_entries(self.log_cache)
             
-            # 应用过滤
-            filter_type = self.level_filter.currentText()
-            if filter_type != "全部":
-                filter_mapping = {
-                    "成功": "排队成功",
-                    "失败": "排队失败", 
-                    "完成": "完成排队",
-                    "系统": "系统事件"
-                }
-                filter_keyword = filter_mapping.get(filter_type)
-                if filter_keyword:
-                    recent_logs = [log for log in recent_logs if filter_keyword in log]
-            
-            # 更新显示
-            self.log_text.clear()
-            for log in recent_logs:
-                self.log_text.append(log.strip())
+            # 缓存已包含尚未写入的待显示日志
+            self._pending.clear()
+            self.log_text.setPlainText('\n'.join(map(format_log_entry, entries)))
             
             # 自动滚动到底部（仅当用户启用时）
             if self.auto_scroll_enabled:
-                cursor = self.log_text.textCursor()
-                cursor.movePosition(QTextCursor.MoveOperation.End)
-                self.log_text.setTextCursor(cursor)
+                self._scroll_to_end()
                 
         except Exception as e:
             gui_logger.error("刷新日志失败", str(e))
     
-    def append_log_text(self, text: str):
-        """添加日志文本到显示区域"""
-        # 添加到缓存
-        self.log_cache.append(text)
+    def append_log_entry(self, category: int, username: Optional[str], detail: str):
+        """
+        添加一条日志到缓存和显示区域
         
-        # 管理缓存大小
-        self.manage_cache_size()
+        Args:
+            category: 日志类别（CAT_*）
+            username: 用户名，系统事件为None
+            detail: 详细信息
+        """
+        entry = (self._timestamp(), category, username, detail)
+        # 添加到缓存
+        self.log_cache.append(entry)
         
-        # 添加到显示区域
-        self.log_text.append(text)
+        # 放入待显示队列，由定时器合并写入
+        self._pending.append(entry)
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+    
+    def _flush_pending(self):
+        """把待显示的日志一次性追加到显示区域"""
+        if not self._pending:
+            return
+        chunk = '\n'.join(map(format_log_entry, self._visible_entries(self._pending)))
+        self._pending.clear()
+        if not chunk:
+            return
+        self.log_text.appendPlainText(chunk)
         
         # 自动滚动（仅当用户启用时）
         if self.auto_scroll_enabled:
-            cursor = self.log_text.textCursor()
-            cursor.movePosition(QTextCursor.MoveOperation.End)
-            self.log_text.setTextCursor(cursor)
+            self._scroll_to_end()
+    
+    def _scroll_to_end(self):
+        """滚动到日志末尾（直接设置滚动条，不移动文本光标）"""
+        scrollbar = self.log_text.verticalScrollBar()
+        scrollbar.setValue(scrollbar.maximum())
     
     def update_stats_display(self):
         """更新统计显示"""
         stats_text = f"统计: 成功: {self.stats['total_success']} | 失败: {self.stats['total_failed']} | 完成: {self.stats['total_complete']}"
-        self.stats_label.setText(stats_text)
+        if stats_text != self.stats_label.text():
+            self.stats_label.setText(stats_text)
     
     def update_session_display(self):
         """更新会话时间显示"""
         session_time = self.stats['session_start'].strftime('%Y-%m-%d %H:%M:%S')
         self.session_label.setText(f"会话开始时间: {session_time}")
     
+    def _timestamp(self) -> str:
+        """返回当前时间的 HH:MM:SS 字符串，每秒只格式化一次"""
+        sec = int(time.time())
+        if sec != self._ts_cache_sec:
+            lt = time.localtime(sec)
+            self._ts_cache_sec = sec
+            self._ts_cache_str = f"{lt.tm_hour:02d}:{lt.tm_min:02d}:{lt.tm_sec:02d}"
+        return self._ts_cache_str
+    
     # 日志记录方法
     def log_queue_success(self, username: str, queue_type: str = "正常排队", cost: int = 1):
         """记录排队成功"""
         self.logger.log_queue_success(username, queue_type, cost)
         self.stats['total_success'] += 1
         
-        timestamp = datetime.now().strftime('%H:%M:%S')
-        log_text = f"[{timestamp}] 排队成功 - {username} - {queue_type} (消耗次数: {cost})"
-        self.log_updated.emit(log_text)
+        self.append_log_entry(CAT_SUCCESS, username, f"{queue_type} (消耗次数: {cost})")
     
     def log_queue_failed(self, username: str, reason: str):
         """记录排队失败"""
         self.logger.log_queue_failed(username, reason)
         self.stats['total_failed'] += 1
         
-        timestamp = datetime.now().strftime('%H:%M:%S')
-        log_text = f"[{timestamp}] 排队失败 - {username} - {reason}"
-        self.log_updated.emit(log_text)
+        self.append_log_entry(CAT_FAILED, username, reason)
     
     def log_queue_complete(self, username: str, queue_type: str = "排队"):
         """记录完成排队"""
         self.logger.log_queue_complete(username, queue_type)
         self.stats['total_complete'] += 1
         
-        timestamp = datetime.now().strftime('%H:%M:%S')
-        log_text = f"[{timestamp}] 完成排队 - {username} - {queue_type}"
-        self.log_updated.emit(log_text)
+        self.append_log_entry(CAT_COMPLETE, username, queue_type)
     
     def log_system_event(self, event: str):
         """记录系统事件"""
         self.logger.log_system_event(event)
         
-        timestamp = datetime.now().strftime('%H:%M:%S')
-        log_text = f"[{timestamp}] 系统事件 - {event}"
-        self.log_updated.emit(log_text)
+        self.append_log_entry(CAT_SYSTEM, None, event)
     
     def log_guard_gift(self, username: str, guard_level: str, reward_count: int, is_new_user: bool = False):
         """记录舰长礼物"""
         self.logger.log_guard_gift(username, guard_level, reward_count, is_new_user)
         
-        timestamp = datetime.now().strftime('%H:%M:%S')
         user_type = "新用户" if is_new_user else "现有用户"
-        log_text = f"[{timestamp}] 舰长礼物 - {username} - {user_type}开通{guard_level}，获得{reward_count}次机会"
-        self.log_updated.emit(log_text)
+        self.append_log_entry(CAT_GUARD, username, f"{user_type}开通{guard_level}，获得{reward_count}次机会")
     
     def eventFilter(self, obj, event):
         """事件过滤器，监听滚轮事件"""
@@ -321,27 +444,3 @@ class LogDisplayWidget(QWidget):
         else:
             self.auto_scroll_btn.setText("自动滚动: 关")
             self.auto_scroll_btn.setChecked(False)
-    
-    def manage_cache_size(self):
-        """管理缓存大小，防止内存过度使用"""
-        if len(self.log_cache) > self.max_cache_size:
-            # 删除最旧的20%缓存
-            remove_count = int(self.max_cache_size * 0.2)
-            self.log_cache = self.log_cache[remove_count:]
-            
-            # 同时清理显示的文本
-            text = self.log_text.toPlainText()
-            lines = text.split('\n')
-            if len(lines) > self.max_cache_size:
-                # 保留最新的80%内容
-                keep_count = int(self.max_cache_size * 0.8)
-                new_text = '\n'.join(lines[-keep_count:])
-                self.log_text.setPlainText(new_text)
-                
-                # 如果启用自动滚动，滚动到底部
-                if self.auto_scroll_enabled:
-                    cursor = self.log_text.textCursor()
-                    cursor.movePosition(QTextCursor.MoveOperation.End)
-                    self.log_text.setTextCursor(cursor)
-            
-            gui_logger.debug("弹幕缓存已清理", f"当前缓存大小: {len(self.log_cache)}")
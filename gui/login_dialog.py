@@ -103,11 +103,11 @@ class LoginDialog(QDialog):
             pixmap, qr_key = self.login_manager.get_qr_code()
             self.qr_key = qr_key
             
-            # 缩放到合适大小并显示
+            # 缩放到合适大小并显示（二维码使用最近邻缩放，保持模块边缘清晰且无需插值计算）
             scaled_pixmap = pixmap.scaled(
                 *Constants.QR_CODE_SIZE,
                 Qt.AspectRatioMode.KeepAspectRatio,
-                Qt.TransformationMode.SmoothTransformation
+                Qt.TransformationMode.FastTransformation
             )
             self.qr_label.setPixmap(scaled_pixmap)
             
@@ -126,7 +126,6 @@ class LoginDialog(QDialog):
         """开始登录状态轮询"""
         if self.login_thread and self.login_thread.isRunning():
             self.login_thread.stop()
-            self.login_thread.wait()
         
         if not self.qr_key:
             return
@@ -138,8 +137,10 @@ class LoginDialog(QDialog):
         self.login_thread.start()
     
     def update_status(self, status: str):
-        """更新状态显示"""
-        self.status_label.setText(status)
+        """更新状态显示（轮询结果与当前显示相同时跳过）"""
+        # 与标签当前文字比较，其他地方直接修改标签后也不会误判
+        if status != self.status_label.text():
+            self.status_label.setText(status)
     
     def on_login_success(self, cookies: dict):
         """登录成功处理"""
@@ -196,5 +197,4 @@ class LoginDialog(QDialog):
         """关闭事件处理"""
         if self.login_thread and self.login_thread.isRunning():
             self.login_thread.stop()
-            self.login_thread.wait()
         event.accept()
@@ -78,6 +78,7 @@ class BilibiliDanmakuMonitor(QMainWindow):
 
         # 监控线程
         self.monitor_thread = None
+        self._stopping_threads = set()  # 正在后台停止的监控线程
 
         # 子窗口引用
         self.queue_window = None
@@ -849,6 +850,7 @@ class BilibiliDanmakuMonitor(QMainWindow):
         # 创建新的监控线程
         self.monitor_thread = DanmakuMonitorThread(room_id, cookies)
         self.monitor_thread.message_received.connect(self.on_message_received)
+        self.monitor_thread.messages_batched.connect(self.on_messages_batched)
         self.monitor_thread.status_changed.connect(self.on_status_changed)
         self.monitor_thread.error_occurred.connect(self.on_error_occurred)
         
@@ -882,14 +884,17 @@ class BilibiliDanmakuMonitor(QMainWindow):
         """断开直播间连接"""
         if self.monitor_thread and self.monitor_thread.isRunning():
             gui_logger.operation_start("断开直播间连接")
-            self.monitor_thread.stop_monitoring()
-            self.monitor_thread.quit()
-            self.monitor_thread.wait(Constants.MONITOR_STOP_TIMEOUT * 1000)  # 等待最多5秒
-            
-            if self.monitor_thread.isRunning():
-                gui_logger.warning("强制终止监控线程")
-                self.monitor_thread.terminate()
-                self.monitor_thread.wait()
+            # 不阻塞界面：线程在后台结束，结束前保留引用避免被提前回收
+            thread = self.monitor_thread
+            # 先断开消息信号，停止过程中残留的弹幕不再进入排队处理
+            try:
+                thread.message_received.disconnect(self.on_message_received)
+                thread.messages_batched.disconnect(self.on_messages_batched)
+            except TypeError:
+                pass
+            self._stopping_threads.add(thread)
+            thread.finished.connect(lambda t=thread: self._stopping_threads.discard(t))
+            thread.stop_monitoring()
         
         # 重置UI状态
         self.connect_btn.setEnabled(True)
@@ -999,6 +1004,16 @@ class BilibiliDanmakuMonitor(QMainWindow):
         except Exception as e:
             gui_logger.error("处理消息异常", str(e))
     
+    def on_messages_batched(self, messages: list):
+        """
+        处理批量接收到的消息
+        
+        Args:
+            messages (list): 消息信息字典列表
+        """
+        for message_info in messages:
+            self.on_message_received(message_info)
+    
     def format_message(self, message_info: dict) -> str:
         """
         格式化消息显示
@@ -1098,9 +1113,20 @@ class BilibiliDanmakuMonitor(QMainWindow):
     
     def closeEvent(self, event):
         """关闭事件处理"""
-        # 断开监控连接
-        if self.monitor_thread and self.monitor_thread.isRunning():
-            self.disconnect_from_room()
+        # 断开监控连接（退出时需要同步等待）
+        threads = set(self._stopping_threads)
+        if self.monitor_thread:
+            threads.add(self.monitor_thread)
+        for thread in threads:
+            if thread.isRunning():
+                thread.stop_monitoring_blocking()
+                thread.quit()
+                thread.wait(Constants.MONITOR_STOP_TIMEOUT * 1000)  # 等待最多5秒
+                
+                if thread.isRunning():
+                    gui_logger.warning("强制终止监控线程")
+                    thread.terminate()
+                    thread.wait()
         
         # 保存队列管理器状态
         if hasattr(self, 'queue_manager'):
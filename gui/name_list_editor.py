@@ -12,12 +12,11 @@ from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QPushButton,
 from PyQt6.QtCore import Qt, pyqtSignal
 import csv
 import os
-import re
 from typing import List, Dict, Optional
 
 from models import QueueItem
 from config import Constants, app_config
-from utils import parse_name_count, format_name_count, gui_logger
+from utils import parse_name_count, format_name_count, read_csv_rows, gui_logger
 
 class NameListEditor(QDialog):
     """名单编辑器对话框"""
@@ -324,25 +323,15 @@ class NameListEditor(QDialog):
             abs_file_path = os.path.abspath(self.name_list_file)
             
             if os.path.exists(abs_file_path):
-                with open(abs_file_path, 'r', encoding='utf-8') as f:
-                    reader = csv.reader(f)
-                    self.name_list = []
-                    
-                    for row_index, row in enumerate(reader, 1):
-                        if not row or not row[0].strip():
-                            continue
-                        
-                        name_with_count = row[0].strip()
-                        if not name_with_count:
-                            continue
-                        
-                        # 解析名字和次数
-                        name, count = parse_name_count(name_with_count)
-                        
-                        if name:
-                            item = QueueItem(name=name, count=count, index=row_index)
-                            self.name_list.append(item)
-                            
+                rows = read_csv_rows(abs_file_path)
+                # 跳过空行，解析名字和次数，序号按文件中的行号计
+                self.name_list = [
+                    QueueItem(name=name, count=count, index=row_index)
+                    for row_index, row in enumerate(rows, 1) if row
+                    for name_with_count in (row[0].strip(),) if name_with_count
+                    for name, count in (parse_name_count(name_with_count),) if name
+                ]
+                
                 gui_logger.operation_complete("加载名单文件", f"成功加载 {len(self.name_list)} 项")
             else:
                 gui_logger.error("名单文件不存在", abs_file_path)
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+名单列表模型模块 - 为搜索对话框提供列表模型和过滤代理
+"""
+
+from typing import Callable, List, Optional
+
+from PyQt6.QtCore import (Qt, QAbstractListModel, QModelIndex,
+                          QSortFilterProxyModel)
+
+from models import QueueItem
+
+
+class QueueItemListModel(QAbstractListModel):
+    """名单项目列表模型（只读）"""
+
+    # 只包含名字的数据角色，供过滤代理按名字匹配
+    NameRole = Qt.ItemDataRole.UserRole + 1
+
+    def __init__(self, items: List[QueueItem], parent=None):
+        """
+        初始化列表模型
+
+        Args:
+            items (List[QueueItem]): 要显示的项目列表
+            parent: 父对象
+        """
+        super().__init__(parent)
+        self.items = items
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        """返回行数"""
+        if parent.isValid():
+            return 0
+        return len(self.items)
+
+    def data(self, index: QModelIndex, role=Qt.ItemDataRole.DisplayRole):
+        """
+        返回指定行的数据
+
+        Args:
+            index (QModelIndex): 行索引
+            role: 数据角色，DisplayRole 返回显示文本，UserRole 返回 QueueItem，NameRole 返回名字
+        """
+        if not index.isValid():
+            return None
+        item = self.items[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return f"{item.name} (序号:{item.index}, 次数:{item.count})"
+        if role == Qt.ItemDataRole.UserRole:
+            return item
+        if role == self.NameRole:
+            return item.name
+        return None
+
+
+class QueueItemFilterProxy(QSortFilterProxyModel):
+    """
+    名单过滤代理
+
+    精确搜索使用Qt内置的固定字符串过滤（不区分大小写），
+    模糊搜索使用调用方提供的按行判断函数
+    """
+
+    def __init__(self, parent=None):
+        """初始化过滤代理"""
+        super().__init__(parent)
+        self.setFilterCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+        self.setFilterRole(QueueItemListModel.NameRole)
+        self._row_predicate: Optional[Callable[[int], bool]] = None
+        self._fixed_text = ""
+
+    def set_search(self, text: str, row_predicate: Optional[Callable[[int], bool]] = None):
+        """
+        设置搜索条件并重新过滤
+
+        Args:
+            text (str): 精确搜索文本（提供 row_predicate 时忽略）
+            row_predicate: 按源模型行号判断是否匹配的函数，为None时使用固定字符串过滤
+        """
+        self._row_predicate = row_predicate
+        fixed_text = text if row_predicate is None else ""
+        if fixed_text != self._fixed_text:
+            # 过滤字符串变化时Qt会自动重新过滤
+            self._fixed_text = fixed_text
+            self.setFilterFixedString(fixed_text)
+        else:
+            self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row: int, source_parent: QModelIndex) -> bool:
+        """判断源模型中的行是否显示"""
+        if self._row_predicate is not None:
+            return self._row_predicate(source_row)
+        return super().filterAcceptsRow(source_row, source_parent)
@@ -113,7 +113,6 @@ def main():
                 main_logger.debug("启动进度", message)
             if splash is not None and message:
                 splash.append_message(message)
-                app.processEvents()
 
         # 初始化并预加载 TTS
         try:
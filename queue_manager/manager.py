@@ -62,10 +62,12 @@ class QueueManager:
         self.boarding_started = False               # 上车是否开始
         self.cutline_started = False                # 插队是否开始
           # 配置文件监听
-        self._config_mtime = app_config.get_file_modification_time()
+        # 文件修改时间由配置模块的监视线程统一检查，这里只比较版本号
+        app_config.start_watcher()
+        self._config_version = app_config.version
         self._config_timer = QTimer()
         self._config_timer.timeout.connect(self._check_config_changes)
-        self._config_timer.start(1000)  # 每秒检查一次配置文件变更
+        self._config_timer.start(1000)  # 每秒检查一次配置版本
         
         # 自动加载名单文件
         if self.name_list_file and os.path.exists(self.name_list_file):
@@ -1050,9 +1052,11 @@ class QueueManager:
     def _check_config_changes(self):
         """检查配置文件变更并重新加载名单文件"""
         try:
-            new_mtime = app_config.reload_if_modified(self._config_mtime)
-            if new_mtime != self._config_mtime:
-                self._config_mtime = new_mtime
+            new_version = app_config.version
+            if new_version != self._config_version:
+                self._config_version = new_version
+                # 监视线程只负责发现变化，配置在界面线程中重新加载
+                app_config.reload_if_changed()
                 # 配置文件已更新，检查名单文件路径是否改变
                 new_path = app_config.get("queue.name_list_file", "")
                 if new_path and new_path.strip():
@@ -1071,7 +1075,7 @@ class QueueManager:
         try:
             # 强制重新加载配置
             app_config.reload_config_from_file()
-            self._config_mtime = app_config.get_file_modification_time()
+            self._config_version = app_config.version
             
             # 获取新的名单文件路径
             new_path = app_config.get("queue.name_list_file", "")
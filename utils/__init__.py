@@ -11,9 +11,16 @@ import time
 import csv
 from typing import Optional, List, Dict, Any, Tuple
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # 导入新的功能模块
 from .logger import QueueLogger
 from .lottery_animation import RandomSelectionAnimationThread  # 现在可以直接导入了
+from .rate_limiter import TokenBucket
 
 # 延迟导入以避免循环导入
 def get_constants():
@@ -242,6 +249,9 @@ def safe_json_load(file_path: str, default: Any = None) -> Any:
     try:
         if os.path.exists(file_path):
             Constants = get_constants()
+            if ORJSON_AVAILABLE:
+                with open(file_path, 'rb') as f:
+                    return orjson.loads(f.read())
             with open(file_path, 'r', encoding=Constants.FILE_ENCODING) as f:
                 return json.load(f)
     except Exception as e:
@@ -273,6 +283,33 @@ def safe_json_save(file_path: str, data: Any) -> bool:
         return False
 
 
+CSV_SNIFF_DELIMITERS = ',\t;|'
+CSV_SNIFF_SAMPLE_SIZE = 4096
+
+
+def read_csv_rows(file_path: str) -> List[List[str]]:
+    """
+    读取CSV文件的所有行，自动识别分隔符
+    
+    使用 utf-8-sig 编码以去掉Excel导出文件开头的BOM，
+    分隔符无法识别时（如只有一列）按逗号处理
+    
+    Args:
+        file_path (str): CSV文件路径
+        
+    Returns:
+        List[List[str]]: 每行的字段列表
+    """
+    with open(file_path, 'r', encoding='utf-8-sig', newline='') as f:
+        sample = f.read(CSV_SNIFF_SAMPLE_SIZE)
+        f.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=CSV_SNIFF_DELIMITERS)
+        except csv.Error:
+            dialect = csv.excel
+        return list(csv.reader(f, dialect))
+
+
 def load_name_list_from_csv(file_path: str) -> List[Dict[str, Any]]:
     """
     从CSV文件加载名单
@@ -291,21 +328,19 @@ def load_name_list_from_csv(file_path: str) -> List[Dict[str, Any]]:
         return name_list
     
     try:
-        Constants = get_constants()
-        with open(file_path, 'r', encoding=Constants.FILE_ENCODING) as f:
-            reader = csv.reader(f)
-            for row_index, row in enumerate(reader):
-                if row and row[0].strip():  # 非空行
-                    name_str = row[0].strip()
-                    name, count = parse_name_count(name_str)
-                    
-                    if name:  # 名字不为空
-                        name_list.append({
-                            'name': name,
-                            'count': count,
-                            'index': row_index + 1,
-                            'original_str': name_str
-                        })
+        rows = read_csv_rows(file_path)
+        # 跳过空行和名字为空的行，序号按文件中的行号计
+        name_list = [
+            {
+                'name': name,
+                'count': count,
+                'index': row_index,
+                'original_str': name_str
+            }
+            for row_index, row in enumerate(rows, 1) if row
+            for name_str in (row[0].strip(),) if name_str
+            for name, count in (parse_name_count(name_str),) if name
+        ]
         
         logger = get_main_logger()
         logger.operation_complete("加载名单文件", f"从 {file_path} 加载了 {len(name_list)} 个项目")
@@ -416,12 +451,7 @@ def validate_cookies(cookies: Dict[str, Any]) -> bool:
         return False
     
     # 检查必要的cookie字段
-    required_fields = ['SESSDATA', 'bili_jct']
-    for field in required_fields:
-        if field not in cookies or not cookies[field]:
-            return False
-    
-    return True
+    return bool(cookies.get('SESSDATA')) and bool(cookies.get('bili_jct'))
 
 
 def filter_cookie_data(cookies: Dict[str, Any]) -> Dict[str, str]:
@@ -133,6 +133,10 @@ class EnhancedLogger:
         self.business_logger.addHandler(business_handler)
         self.business_logger.propagate = False  # 不传播到父日志器
     
+    def isEnabledFor(self, level: int) -> bool:
+        """检查指定级别的日志是否会被记录（透传到底层日志器）"""
+        return self.logger.isEnabledFor(level)
+    
     def debug(self, message: str, extra_info: str = ""):
         """记录调试信息"""
         full_message = f"{message} {extra_info}".strip()
@@ -153,6 +157,11 @@ class EnhancedLogger:
         full_message = f"{message} {extra_info}".strip()
         self.logger.error(full_message, exc_info=exc_info)
     
+    def exception(self, message: str, extra_info: str = ""):
+        """记录错误及当前异常堆栈（仅在实际输出时格式化堆栈）"""
+        full_message = f"{message} {extra_info}".strip()
+        self.logger.exception(full_message)
+    
     def operation_start(self, operation: str, details: str = ""):
         """记录操作开始"""
         message = f"正在进行 {operation}..."
@@ -219,11 +228,8 @@ class EnhancedLogger:
             if not os.path.exists(business_log_file):
                 return []
             
-            with open(business_log_file, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-                # 过滤掉注释行
-                lines = [line for line in lines if not line.startswith('#')]
-                return lines[-max_lines:]
+            from .logger import read_log_tail
+            return read_log_tail(business_log_file, max_lines)
         except Exception as e:
             self.error(f"读取业务日志失败", str(e))
             return []
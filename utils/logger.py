@@ -4,7 +4,9 @@
 日志记录工具模块 - 处理排队日志记录
 """
 
+import io
 import os
+import mmap
 from datetime import datetime
 from typing import List
 
@@ -15,6 +17,38 @@ def get_constants():
     return Constants
 
 
+def read_log_tail(log_file: str, max_lines: int) -> List[str]:
+    """
+    读取日志文件末尾的若干行（跳过以#开头的注释行）
+    
+    通过内存映射从文件末尾向前查找换行，只解码需要的最后一段，
+    耗时与要读取的行数有关，而与日志文件总大小无关
+    
+    Args:
+        log_file: 日志文件路径
+        max_lines: 最大行数
+        
+    Returns:
+        List[str]: 日志行列表（保留行尾换行符）
+    """
+    size = os.path.getsize(log_file)
+    if size == 0 or max_lines <= 0:
+        return []
+    
+    with open(log_file, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        start = size
+        count = 0
+        while start > 0 and count < max_lines:
+            start = mm.rfind(b'\n', 0, start - 1) + 1
+            if mm[start:start + 1] != b'#':
+                count += 1
+        tail = mm[start:size].decode('utf-8')
+    
+    # 与文本模式读取一致，统一换行符为\n
+    lines = io.StringIO(tail, newline=None).readlines()
+    return [line for line in lines if not line.startswith('#')]
+
+
 class QueueLogger:
     """排队日志记录器"""
     
@@ -132,11 +166,7 @@ class QueueLogger:
             if not os.path.exists(self.log_file):
                 return []
             
-            with open(self.log_file, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-                # 过滤掉注释行
-                lines = [line for line in lines if not line.startswith('#')]
-                return lines[-max_lines:]
+            return read_log_tail(self.log_file, max_lines)
         except Exception as e:
             print(f"读取日志失败: {e}")
             return []
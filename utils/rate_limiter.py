@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+限流工具模块 - 令牌桶限流器
+"""
+
+import time
+
+
+class TokenBucket:
+    """令牌桶限流器，用于限制高开销操作（如格式化异常堆栈）的频率"""
+    
+    def __init__(self, rate: float, burst: int):
+        """
+        初始化令牌桶
+        
+        Args:
+            rate (float): 每秒补充的令牌数
+            burst (int): 桶容量（允许的突发次数）
+        """
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._last = time.monotonic()
+    
+    def allow(self) -> bool:
+        """
+        尝试取出一个令牌
+        
+        Returns:
+            bool: 是否允许本次操作
+        """
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False